@@ -6,7 +6,7 @@ from functions import *
 
 # constants used mostly for pygame
 TILE_SIZE = 100                   # size of each tile
-GRID_SIZE = 3                     # 3x3 grid
+GRID_SIZE = 3                     # 3x3 grid, any size works
 WIDTH = TILE_SIZE * GRID_SIZE     # window width
 HEIGHT = TILE_SIZE * GRID_SIZE    # window height
 
@@ -15,16 +15,10 @@ TILE_COLOR = (52, 138, 82)      # tile color
 TEXT_COLOR = (255, 255, 255)    # text color
 
 # Define goal state
-GOAL_BOARD = [
-    [1, 2, 3],
-    [4, 5, 6],
-    [7, 8, None]
-]
+GOAL_BOARD = make_goal_board(GRID_SIZE)
 
 # Precompute goal positions for heuristic calculations
-GOAL_POSITIONS = {1: (0, 0), 2: (0, 1), 3: (0, 2),
-                  4: (1, 0), 5: (1, 1), 6: (1, 2),
-                  7: (2, 0), 8: (2, 1), None: (2, 2)}
+GOAL_POSITIONS = make_goal_positions(GOAL_BOARD)
 
 # Pygame setup
 pygame.init()
@@ -48,7 +42,8 @@ def draw_puzzle(board):
 
 # Initialize puzzle and solve
 tile_set = random_solvable_board(GRID_SIZE)
-solution = a_star_search(tile_set, GRID_SIZE, GOAL_POSITIONS, GOAL_BOARD)
+solution = a_star_search(tile_set, GRID_SIZE, GOAL_POSITIONS, GOAL_BOARD, return_moves=True)
+steps = replay_moves(tile_set, solution) if solution is not None else iter(())   # boards made as they are drawn
 clock = pygame.time.Clock()
 step_index = 0
 solved = False
@@ -61,13 +56,13 @@ while True:
             sys.exit()
 
     # Animate solution steps
-    if solution is not None and step_index < len(solution):
-        tile_set = solution[step_index]
+    if solution is not None and step_index <= len(solution):
+        tile_set = next(steps)
         step_index += 1
     # print when solution is complete
     elif solution is not None and not solved:
         solved = True
-        print('Solution length:', len(solution) - 1)
+        print('Solution length:', len(solution))
     
     draw_puzzle(tile_set)   # call the draw function
     pygame.display.flip()   # dispaly the updated pygame screen
@@ -0,0 +1,105 @@
+# anytime search
+# ARA*: a first weighted A* pass (f = g + weight * h) finds a solution fast, then the weight is lowered step by step
+# and each pass reuses the g-scores of the last one, so every pass is cheaper than a fresh search. Each solution comes
+# with its suboptimality bound: it is at most bound times longer than the optimal solution. Search stops when the
+# time or node budget runs out, and the last solution found is the best one.
+#   for moves, bound in ara_star_search(board, 4, goal_positions, goal_board, time_limit=0.5):
+#       ...
+import time
+import heapq
+from functions import *
+
+# generator of (move string, suboptimality bound), each one shorter or with a tighter bound than the one before
+# weight is the first pass's heuristic weight, lowered by step after every pass until it reaches final_weight
+# time_limit (seconds) and node_limit (boards expanded) are the budget for all passes together, None for no limit
+def ara_star_search(start_board, grid_size, goal_positions, goal_board, weight=3.0, step=0.5, final_weight=1.0,
+                    time_limit=None, node_limit=None, heuristic_fn=None):
+    if is_solvable(start_board) != is_solvable(goal_board):
+        return
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    moves = move_table(grid_size)
+    start = tuple(tile for row in start_board for tile in row)
+    goal = tuple(tile for row in goal_board for tile in row)
+
+    # heuristic of a flat board from its parent's, worked out once per board
+    def child_h(flat, blank, pos, h, child):
+        if heuristic_fn is None:
+            return flat_heuristic_delta(flat, blank, pos, h, grid_size, goal_positions)
+        return heuristic_fn([child[i:i + grid_size] for i in range(0, len(child), grid_size)], grid_size, goal_positions)
+
+    h_of = {start: heuristic(start_board, grid_size, goal_positions) if heuristic_fn is None
+            else heuristic_fn(start_board, grid_size, goal_positions)}
+    g_score = {start: 0}
+    came_from = {}
+    blank_of = {start: start.index(None)}
+    closed = set()
+    incons = set()                  # boards improved after they were expanded in this pass, expanded again next pass
+    open_heap = [(weight * h_of[start], 0, start)]
+    counter = 1
+    expanded = 0
+    last = None
+
+    while True:
+        # one weighted A* pass: expand until no open board could beat the goal's f (g, its h is 0)
+        while open_heap and open_heap[0][0] < g_score.get(goal, float('inf')):
+            if (node_limit is not None and expanded >= node_limit) or (deadline is not None and time.perf_counter() > deadline):
+                return
+            f, _, current = heapq.heappop(open_heap)
+            if current in closed or f != g_score[current] + weight * h_of[current]:
+                continue                                        # stale entry
+            closed.add(current)
+            expanded += 1
+            current_g = g_score[current]
+            blank = blank_of[current]
+            for pos in moves[blank]:
+                child = list(current)
+                child[blank], child[pos] = child[pos], None
+                child = tuple(child)
+                if current_g + 1 < g_score.get(child, float('inf')):
+                    g_score[child] = current_g + 1
+                    came_from[child] = current
+                    if child not in h_of:
+                        h_of[child] = child_h(current, blank, pos, h_of[current], child)
+                        blank_of[child] = pos
+                    if child in closed:
+                        incons.add(child)
+                    else:
+                        heapq.heappush(open_heap, (current_g + 1 + weight * h_of[child], counter, child))
+                        counter += 1
+        if goal not in g_score:
+            return                                              # nothing left to expand, no solution
+
+        # the path found and its bound: no solution is shorter than the smallest g + h still open
+        blanks = []
+        board = goal
+        while True:
+            blanks.append(blank_of[board])
+            if board not in came_from:
+                break
+            board = came_from[board]
+        blanks.reverse()
+        pending = {board for _, _, board in open_heap if board not in closed} | incons
+        lower = min((g_score[board] + h_of[board] for board in pending), default=g_score[goal])
+        bound = max(1.0, min(weight, g_score[goal] / lower)) if lower else 1.0
+        if last is None or len(blanks) - 1 < len(last[0]) or bound < last[1]:   # passes that found nothing better are not reported
+            last = blank_path_to_string(blanks, grid_size), bound
+            yield last
+        if weight <= final_weight or bound == 1.0:
+            return
+
+        # next pass: lower weight, the improved boards go back on the open list and every key is worked out again
+        weight = max(final_weight, weight - step)
+        open_heap = [(g_score[board] + weight * h_of[board], i, board) for i, board in enumerate(pending)]
+        heapq.heapify(open_heap)
+        counter = len(open_heap)
+        incons = set()
+        closed = set()
+
+# best (move string, bound) found within the budget, or None if not even the first pass finished
+def anytime_search(start_board, grid_size, goal_positions, goal_board, weight=3.0, step=0.5, time_limit=None,
+                   node_limit=None, heuristic_fn=None):
+    best = None
+    for best in ara_star_search(start_board, grid_size, goal_positions, goal_board, weight, step, 1.0,
+                                time_limit, node_limit, heuristic_fn):
+        pass
+    return best
@@ -0,0 +1,99 @@
+# batch solving
+# solve many boards at once on a pool of worker processes, handing back each result as soon as it is done
+# boards travel to the workers as encode_board strings and only a few chunks are in flight at a time,
+# so any number of boards can be streamed through without holding them all in memory
+import os
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from functions import *
+from packed import a_star_search_packed
+from bidirectional import bidirectional_search
+
+# search functions by method name, 'knowledge' looks boards up in knowledge.bin instead
+SOLVERS = {
+    'a_star': a_star_search,
+    'ida_star': ida_star_search,
+    'packed': a_star_search_packed,
+    'bidirectional': bidirectional_search,
+}
+METHODS = list(SOLVERS) + ['knowledge']
+
+_knowledge = None   # knowledge base of this worker process, mapped once when the worker starts
+
+# runs once in every worker process
+def _init_worker(method, knowledge_path):
+    global _knowledge
+    if method == 'knowledge':
+        from knowledge import open_knowledge
+        _knowledge = open_knowledge(knowledge_path)
+
+# solve one chunk of (index, key) pairs inside a worker into (index, key, moves, error)
+# moves is a move string, or None for boards with no solution; error says why a board couldn't be solved, or is None
+# the grid size is worked out for every key, so one chunk can hold boards of different sizes
+def _solve_chunk(method, chunk):
+    goals = {}                                  # grid size -> (goal_board, goal_positions)
+    results = []
+    for index, key in chunk:
+        grid_size = int(round(len(key) ** 0.5))
+        if grid_size not in goals:
+            goal_board = make_goal_board(grid_size)
+            goals[grid_size] = (goal_board, make_goal_positions(goal_board))
+        goal_board, goal_positions = goals[grid_size]
+        board = decode_board(key, grid_size)
+        error = None
+        if not is_solvable(board):              # a search would walk the whole reachable half of the state space
+            moves = None
+        elif method == 'knowledge':
+            if _knowledge.fits(board):
+                moves = _knowledge.lookup_string(board)
+            else:
+                moves = None
+                error = f"knowledge base only holds {_knowledge.rows}x{_knowledge.cols} boards"
+        else:
+            moves = SOLVERS[method](board, grid_size, goal_positions, goal_board, return_moves=True)
+        results.append((index, key, moves, error))
+    return results
+
+# solve every board in boards (boards or encode_board strings), yielding (index, key, moves, error) in the order they finish
+# chunksize boards are sent to a worker at once, raise it for cheap methods like 'knowledge'
+def solve_many(boards, workers=None, method='a_star', chunksize=1, knowledge_path='knowledge.bin'):
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
+    keys = (board if isinstance(board, str) else encode_board(board) for board in boards)
+    items = enumerate(keys)
+    chunks = iter(lambda: list(islice(items, chunksize)), [])
+
+    workers = workers or os.cpu_count()
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(method, knowledge_path))
+    try:
+        # keep a couple of chunks queued per worker so no worker waits on the next one
+        pending = {pool.submit(_solve_chunk, method, chunk)
+                   for chunk in islice(chunks, 2 * workers)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for chunk in islice(chunks, 1):
+                    pending.add(pool.submit(_solve_chunk, method, chunk))
+                yield from future.result()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+# same results as solve_many, solved one after another in this process
+def solve_serial(boards, method='a_star', knowledge_path='knowledge.bin'):
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
+    _init_worker(method, knowledge_path)
+    for index, board in enumerate(boards):
+        key = board if isinstance(board, str) else encode_board(board)
+        yield from _solve_chunk(method, [(index, key)])
+
+# solve one board (or encode_board string) in this process into (moves, error), the same as a result of solve_many
+# meant to be sent to a process pool one board at a time; a 'knowledge' worker maps the file on its first board
+def solve_one(board, method='a_star', knowledge_path='knowledge.bin'):
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
+    if method == 'knowledge' and _knowledge is None:
+        _init_worker(method, knowledge_path)
+    key = board if isinstance(board, str) else encode_board(board)
+    _, _, moves, error = _solve_chunk(method, [(0, key)])[0]
+    return moves, error
@@ -0,0 +1,316 @@
+# benchmark
+# times every engine on the same seeded corpus of boards, bucketed by their optimal number of moves from the knowledge base,
+# and writes the results as JSON so runs on different commits can be compared:
+#   python benchmark.py --output base.json
+#   python benchmark.py --compare base.json              exits with 1 if an engine got slower than --tolerance allows
+#   python benchmark.py --heuristics manhattan linear_conflict walking_distance     A* node counts for each heuristic instead
+# every engine runs in a fresh process, whose peak RSS is reset when it starts so the parent's peak doesn't carry over
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import tracemalloc
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functions import *
+from heap import BinaryHeap, BucketQueue
+from stats import SearchStats
+from packed import a_star_search_packed
+from ranked import a_star_search_ranked
+from bidirectional import bidirectional_search
+from parallel import hda_star_search
+from knowledge import open_knowledge
+from walking_distance import WalkingDistance
+
+DEPTHS = [4, 8, 12, 16, 20, 24, 28]
+NOISE_MS = 0.1                                  # p50 changes smaller than this are never counted as regressions
+
+# open list class that counts its pops into stats.expanded, for searches that don't fill in a SearchStats
+# themselves (stale pops are counted too)
+def counting(queue_class, stats):
+    class Counting(queue_class):
+        def pop(self):
+            stats.expanded += 1
+            return super().pop()
+    return Counting
+
+# engine running a search that fills in stats itself
+def _stats_engine(search, queue_class=BinaryHeap):
+    def make(knowledge_path):
+        def solve(board, grid_size, goal_positions, goal_board, stats=None):
+            return search(board, grid_size, goal_positions, goal_board, open_list=queue_class, return_moves=True, stats=stats)
+        return solve, True
+    return make
+
+# engine running a search that is counted through its open list
+def _search_engine(search, queue_class=BinaryHeap):
+    def make(knowledge_path):
+        def solve(board, grid_size, goal_positions, goal_board, stats=None):
+            open_list = queue_class if stats is None else counting(queue_class, stats)
+            return search(board, grid_size, goal_positions, goal_board, open_list=open_list, return_moves=True)
+        return solve, True
+    return make
+
+def _bidirectional_engine(knowledge_path):
+    def solve(board, grid_size, goal_positions, goal_board, stats=None):
+        return bidirectional_search(board, grid_size, goal_positions, goal_board, return_moves=True, stats=stats)
+    return solve, True
+
+def _hda_star_engine(knowledge_path):
+    def solve(board, grid_size, goal_positions, goal_board, stats=None):
+        return hda_star_search(board, grid_size, goal_positions, goal_board, return_moves=True, stats=stats)
+    return solve, True
+
+def _ida_star_engine(knowledge_path):
+    def solve(board, grid_size, goal_positions, goal_board, stats=None):
+        return ida_star_search(board, grid_size, goal_positions, goal_board, return_moves=True)
+    return solve, False
+
+def _knowledge_engine(knowledge_path):
+    kb = open_knowledge(knowledge_path)
+    def solve(board, grid_size, goal_positions, goal_board, stats=None):
+        return kb.lookup_string(board)
+    return solve, False
+
+# engine name -> make(knowledge_path) returning (solve, counted):
+# solve(board, grid_size, goal_positions, goal_board, stats=None) gives a move string and counts into stats if it is given,
+# counted is False for engines that can't count nodes
+ENGINES = {
+    'a_star': _stats_engine(a_star_search),
+    'a_star_bucket': _stats_engine(a_star_search, BucketQueue),
+    'packed': _search_engine(a_star_search_packed),
+    'ranked': _search_engine(a_star_search_ranked, BucketQueue),
+    'bidirectional': _bidirectional_engine,
+    'hda_star': _hda_star_engine,
+    'ida_star': _ida_star_engine,
+    'knowledge': _knowledge_engine,
+}
+
+# heuristic name -> make(grid_size) returning a heuristic_fn for the searches
+HEURISTICS = {
+    'manhattan': lambda grid_size: heuristic_sum,
+    'linear_conflict': lambda grid_size: heuristic,
+    'walking_distance': WalkingDistance,
+}
+
+# A* with each heuristic on every board of the corpus: boards expanded per board, in corpus order, and in total
+def compare_heuristics(names, corpus):
+    results = {}
+    for name in names:
+        heuristics = {}
+        nodes = []
+        by_depth = {}
+        start = time.perf_counter()
+        for depth, key in corpus:
+            grid_size = int(round(len(key) ** 0.5))
+            if grid_size not in heuristics:
+                heuristics[grid_size] = HEURISTICS[name](grid_size)
+            goal_board = make_goal_board(grid_size)
+            stats = SearchStats()
+            a_star_search(decode_board(key, grid_size), grid_size, make_goal_positions(goal_board), goal_board,
+                          heuristic_fn=heuristics[grid_size], return_moves=True, stats=stats)
+            nodes.append(stats.expanded)
+            by_depth[str(depth)] = by_depth.get(str(depth), 0) + stats.expanded
+        results[name] = {
+            "seconds": time.perf_counter() - start,
+            "nodes": sum(nodes),
+            "nodes_by_depth": by_depth,
+            "nodes_by_board": nodes,
+        }
+    return results
+
+# nearest rank percentile of a list of numbers
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered))) - 1))]
+
+# reset this process's peak resident set size to its current size (Linux only)
+# a spawned child starts out with its parent's ru_maxrss, so without this every engine reports the parent's peak
+def reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+# peak resident set size of this process in KB since reset_peak_rss, from VmHWM where there is one
+# (ru_maxrss otherwise, in bytes on macOS)
+def peak_rss_kb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+# [(depth, key)]: per_depth boards for each depth, drawn with a seeded generator from the knowledge base
+# the same knowledge base, depths and seed always give the same corpus
+def build_corpus(knowledge_path, depths=DEPTHS, per_depth=10, seed=0):
+    rng = random.Random(seed)
+    by_depth = {depth: [] for depth in depths}
+    with open_knowledge(knowledge_path) as kb:
+        rows, cols = kb.rows, kb.cols
+        for rank, length in kb.depths():
+            if length in by_depth:
+                by_depth[length].append(rank)
+    corpus = []
+    for depth in depths:
+        ranks = by_depth[depth]
+        for rank in rng.sample(ranks, min(per_depth, len(ranks))):
+            perm = unrank_permutation(rank, rows * cols)
+            corpus.append((depth, encode_board([perm[i:i + cols] for i in range(0, rows * cols, cols)])))
+    return corpus
+
+# run one engine over the corpus, in its own process
+# each board is solved repeat times and its fastest time kept, which filters out most scheduling noise.
+# Counting engines solve each board once more, untimed, with a SearchStats for the node counts
+def run_engine(name, corpus, knowledge_path, repeat=3):
+    reset_peak_rss()
+    solve, counted = ENGINES[name](knowledge_path)
+    goals = {}
+    # (board, grid_size, goal_positions, goal_board) of an encode_board key
+    def arguments(key):
+        grid_size = int(round(len(key) ** 0.5))
+        if grid_size not in goals:
+            goal_board = make_goal_board(grid_size)
+            goals[grid_size] = (make_goal_positions(goal_board), goal_board)
+        return (decode_board(key, grid_size), grid_size) + goals[grid_size]
+
+    stats = SearchStats() if counted else None
+    latencies = []
+    by_depth = {}
+    most_nodes = 0                                  # largest single search, for memory per node
+    largest = None
+    solve(*arguments(corpus[0][1]))                 # untimed warm up
+    for depth, key in corpus:
+        args = arguments(key)
+        board, goal_board = args[0], args[3]
+        elapsed = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            moves = solve(*args)
+            elapsed = min(elapsed, time.perf_counter() - start)
+        if moves is None or list(replay_moves(board, moves))[-1] != goal_board:
+            raise RuntimeError(f"{name} did not solve {key}")
+        latencies.append(elapsed)
+        by_depth.setdefault(depth, []).append(elapsed)
+        if counted:
+            before = stats.expanded
+            solve(*args, stats=stats)
+            if stats.expanded - before > most_nodes:
+                most_nodes = stats.expanded - before
+                largest = args
+
+    total = sum(latencies)
+    rss = peak_rss_kb()
+    # memory per node: peak Python allocations while solving the largest search again, traced
+    bytes_per_node = None
+    if largest is not None:
+        tracemalloc.start()
+        solve(*largest)
+        bytes_per_node = tracemalloc.get_traced_memory()[1] / most_nodes
+        tracemalloc.stop()
+    return {
+        "boards": len(latencies),
+        "seconds": total,
+        "boards_per_second": len(latencies) / total if total else None,
+        "nodes": stats.expanded if counted else None,
+        "nodes_per_second": stats.expanded / total if counted and total else None,
+        "latency_ms": {"p50": percentile(latencies, 50) * 1000, "p95": percentile(latencies, 95) * 1000,
+                       "p99": percentile(latencies, 99) * 1000, "max": max(latencies) * 1000},
+        "p50_ms_by_depth": {str(depth): percentile(times, 50) * 1000 for depth, times in by_depth.items()},
+        "peak_rss_kb": rss,
+        "bytes_per_node": bytes_per_node,
+        "stats": stats.as_dict() if counted and stats.searches else None,   # only searches that fill it in themselves
+    }
+
+# results of every engine, each run in a fresh spawned process
+def run(engines, corpus, knowledge_path, repeat=3):
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for name in engines:
+        with ProcessPoolExecutor(1, mp_context=context) as pool:
+            results[name] = pool.submit(run_engine, name, corpus, knowledge_path, repeat).result()
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+# engines whose p50 latency grew by more than tolerance (and NOISE_MS) over the baseline, as (name, old p50, new p50)
+def regressions(baseline, report, tolerance):
+    found = []
+    for name, result in report.get("engines", {}).items():
+        old = baseline["engines"].get(name)
+        if old is None:
+            continue
+        before, after = old["latency_ms"]["p50"], result["latency_ms"]["p50"]
+        if after > before * (1 + tolerance) and after - before > NOISE_MS:
+            found.append((name, before, after))
+    return found
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the solvers on a fixed corpus of boards.")
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument('--knowledge', default='knowledge.bin', help="knowledge base the corpus is drawn from")
+    parser.add_argument('--depths', nargs='+', type=int, default=DEPTHS, help="optimal solution lengths to draw boards at")
+    parser.add_argument('--per-depth', type=int, default=10, help="boards drawn at each depth")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="times each board is solved, the fastest counts")
+    parser.add_argument('--corpus', help="JSON corpus file to use instead of drawing one")
+    parser.add_argument('--save-corpus', help="write the corpus used to this JSON file")
+    parser.add_argument('--output', help="write the results here instead of stdout")
+    parser.add_argument('--compare', metavar='BASELINE', help="results file to compare against")
+    parser.add_argument('--heuristics', nargs='+', choices=list(HEURISTICS),
+                        help="compare A* node counts for these heuristics instead of timing the engines")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed p50 slowdown over the baseline")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        with open(args.corpus) as f:
+            corpus = [tuple(entry) for entry in json.load(f)]
+    else:
+        corpus = build_corpus(args.knowledge, args.depths, args.per_depth, args.seed)
+    if args.save_corpus:
+        with open(args.save_corpus, 'w') as f:
+            json.dump(corpus, f)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "corpus": len(corpus),
+        "repeat": args.repeat,
+    }
+    if args.heuristics:
+        report["heuristics"] = compare_heuristics(args.heuristics, corpus)
+    else:
+        report["engines"] = run(args.engines, corpus, args.knowledge, args.repeat)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        found = regressions(baseline, report, args.tolerance)
+        for name, old, new in found:
+            print(f"{name}: p50 {old:.2f} ms -> {new:.2f} ms", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# bidirectional search
+# MM (Holte et al.): one A* from the start towards the goal and one from the goal towards the start, with the same
+# neighbor generation and incremental heuristic as a_star_search. Each side's heuristic estimates the distance to
+# the other end. Both sides order their open lists by max(f, 2g), so neither search goes past the middle of the
+# solution, and the side whose best priority is lower expands next. Whenever a board reached by one side has been
+# reached by the other, the two halves make a solution of length U. U is optimal once no open board on either side
+# could be part of a shorter one: U <= max(lowest priority, lowest f of each side, lowest g of the two sides + 1)
+import heapq
+from functions import *
+
+# one side of the search; its three open lists order the same boards by priority, by f and by g
+# entries are dropped lazily when they are popped or peeked, once their board is closed or reached with a lower g
+class _Frontier:
+    def __init__(self, root_t, root_h, target_positions):
+        self.target_positions = target_positions    # goal positions of the board this side searches towards
+        self.g_score = {root_t: 0}
+        self.h_score = {root_t: root_h}
+        self.came_from = {}
+        self.closed = set()
+        self.open = [[], [], []]                    # heaps of (priority, ...), (f, ...), (g, counter, board)
+        self.counter = 0
+        self.expanded = 0
+        self.push(root_t)
+
+    # keys of a board for the three open lists
+    def keys(self, board_t):
+        g = self.g_score[board_t]
+        f = g + self.h_score[board_t]
+        return max(f, 2 * g), f, g
+
+    def push(self, board_t):
+        for heap, key in zip(self.open, self.keys(board_t)):
+            heapq.heappush(heap, (key, self.counter, board_t))
+        self.counter += 1
+
+    # smallest live key of open list i, or infinity when it is empty
+    def peek(self, i):
+        heap = self.open[i]
+        while heap and (heap[0][2] in self.closed or heap[0][0] != self.keys(heap[0][2])[i]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else float('inf')
+
+    # take the board with the lowest priority off the open list
+    def pop(self):
+        self.peek(0)
+        board_t = heapq.heappop(self.open[0])[2]
+        self.closed.add(board_t)
+        self.expanded += 1
+        return board_t
+
+# same arguments and result as a_star_search (stats only gets the expanded count)
+def bidirectional_search(start_board, grid_size, goal_positions, goal_board, return_moves=False, stats=None):
+    if is_solvable(start_board) != is_solvable(goal_board):   # the two searches would never meet
+        return None
+    start_t = board_to_tuple(start_board)
+    goal_t = board_to_tuple(goal_board)
+    start_positions = make_goal_positions(start_board)
+    forward = _Frontier(start_t, heuristic(start_board, grid_size, goal_positions), goal_positions)
+    backward = _Frontier(goal_t, heuristic(goal_board, grid_size, start_positions), start_positions)
+
+    best = 0 if start_t == goal_t else float('inf')            # U, the shortest solution found so far
+    meet = start_t if start_t == goal_t else None
+    while True:
+        priority_forward, priority_backward = forward.peek(0), backward.peek(0)
+        if priority_forward == float('inf') or priority_backward == float('inf'):
+            break                                               # one side has nothing left
+        lower = max(min(priority_forward, priority_backward), forward.peek(1), backward.peek(1),
+                    forward.peek(2) + backward.peek(2) + 1)
+        if best <= lower:
+            break
+        side, other = (forward, backward) if priority_forward <= priority_backward else (backward, forward)
+        current_t = side.pop()
+        current_g = side.g_score[current_t]
+        current_h = side.h_score[current_t]
+        for neighbor_t, blank_pos, tile_pos in find_all_moves_with_positions(current_t, grid_size):
+            tentative_g = current_g + 1
+            if tentative_g >= side.g_score.get(neighbor_t, float('inf')):
+                continue
+            side.closed.discard(neighbor_t)                     # only reopened if the heuristic is inconsistent
+            side.g_score[neighbor_t] = tentative_g
+            side.came_from[neighbor_t] = current_t
+            if neighbor_t not in side.h_score:
+                side.h_score[neighbor_t] = heuristic_delta(current_t, neighbor_t, current_h, blank_pos, tile_pos,
+                                                           grid_size, side.target_positions)
+            side.push(neighbor_t)
+            if neighbor_t in other.g_score and tentative_g + other.g_score[neighbor_t] < best:
+                best = tentative_g + other.g_score[neighbor_t]
+                meet = neighbor_t
+
+    if stats is not None:
+        stats.searches += 1
+        stats.expanded += forward.expanded + backward.expanded
+    if meet is None:
+        return None
+    # start -> meeting board from the forward side, then meeting board -> goal from the backward side
+    path = [meet]
+    while path[-1] in forward.came_from:
+        path.append(forward.came_from[path[-1]])
+    path.reverse()
+    while path[-1] in backward.came_from:
+        path.append(backward.came_from[path[-1]])
+    if return_moves:
+        blanks = [next(i * grid_size + j for i, row in enumerate(t) for j, tile in enumerate(row) if tile is None) for t in path]
+        return blank_path_to_string(blanks, grid_size)
+    return [tuple_to_board(t) for t in path]
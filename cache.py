@@ -0,0 +1,106 @@
+# solution cache
+# sits in front of any solver: boards are keyed by the encode_board string of their canonical board (see symmetry.py),
+# recently used solutions are kept in a bounded LRU, and an optional SQLite file keeps every solution across restarts.
+# Storing a solution also stores one for every board along its path, since the rest of an optimal path is an
+# optimal solution of the board it passes through, so one search answers every board it walked through.
+import sqlite3
+from collections import OrderedDict
+from functions import *
+from symmetry import canonical_board, transpose_moves
+
+class SolutionCache:
+    # solver is any search taking (board, grid_size, goal_positions, goal_board, return_moves=True)
+    # path is the SQLite file to back the cache with, None keeps it in memory only
+    def __init__(self, solver=a_star_search, capacity=100000, path=None):
+        self.solver = solver
+        self.capacity = capacity
+        self.entries = OrderedDict()                # canonical key -> move string, least recently used first
+        self.goals = {}                             # grid size -> (goal board, goal positions)
+        self.hits = 0
+        self.disk_hits = 0                          # misses in memory that were found in the file
+        self.misses = 0
+        self.evictions = 0
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path)
+            self.db.execute("CREATE TABLE IF NOT EXISTS solutions (board TEXT PRIMARY KEY, moves TEXT NOT NULL)")
+
+    # boards can be given as boards or as encode_board strings
+    def _board(self, board):
+        if isinstance(board, str):
+            return decode_board(board, int(round(len(board) ** 0.5)))
+        return board
+
+    # keep a canonical entry in memory, dropping the least recently used one when full
+    def _remember(self, key, moves):
+        self.entries[key] = moves
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    # cached moves that solve the board, or None
+    def get(self, board):
+        canonical, transposed = canonical_board(self._board(board))
+        key = encode_board(canonical)
+        moves = self.entries.get(key)
+        if moves is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        elif self.db is not None:
+            row = self.db.execute("SELECT moves FROM solutions WHERE board = ?", (key,)).fetchone()
+            if row is not None:
+                moves = row[0]
+                self._remember(key, moves)
+                self.disk_hits += 1
+        if moves is None:
+            self.misses += 1
+            return None
+        return transpose_moves(moves) if transposed else moves
+
+    # store the moves that solve a board, and the rest of them for every board along the way
+    def put(self, board, moves):
+        rows = []
+        for i, step in enumerate(replay_moves(self._board(board), moves)):
+            if i == len(moves):                     # the goal itself
+                break
+            canonical, transposed = canonical_board(step)
+            key = encode_board(canonical)
+            rest = transpose_moves(moves[i:]) if transposed else moves[i:]
+            self._remember(key, rest)
+            rows.append((key, rest))
+        if self.db is not None:
+            self.db.executemany("INSERT OR IGNORE INTO solutions VALUES (?, ?)", rows)
+            self.db.commit()
+
+    # moves that solve the board, from the cache or from the solver (None if the board has no solution)
+    def solve(self, board):
+        board = self._board(board)
+        if not is_solvable(board):
+            return None
+        moves = self.get(board)
+        if moves is None:
+            grid_size = len(board)
+            if grid_size not in self.goals:
+                goal_board = make_goal_board(grid_size)
+                self.goals[grid_size] = (goal_board, make_goal_positions(goal_board))
+            goal_board, goal_positions = self.goals[grid_size]
+            moves = self.solver(board, grid_size, goal_positions, goal_board, return_moves=True)
+            if moves is not None:
+                self.put(board, moves)
+        return moves
+
+    # counters for monitoring
+    def stats(self):
+        return {"size": len(self.entries), "capacity": self.capacity, "hits": self.hits,
+                "disk_hits": self.disk_hits, "misses": self.misses, "evictions": self.evictions}
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,7 +1,10 @@
 # functions file
 # used to holding frequently used functions to prevent needlessly defining them everywhere
+import time
 import random
+from math import factorial
 from heap import BinaryHeap
+from stats import SearchStats
 
 # flatten board to tuple
 def board_to_tuple(board):
@@ -11,6 +14,72 @@ def board_to_tuple(board):
 def tuple_to_board(t):
     return [list(row) for row in t]
 
+# characters used for tiles when encoding, so boards past 3x3 still get one character per tile
+TILE_CHARS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+# encode board into a string, i.e. [[1, 2, 3], [4, 5, 6], [7, 8, None]] -> 123456780
+def encode_board(board):
+    string = ""
+    for row in board:
+        for tile in row:
+            if tile is None:
+                string += '0'
+            else:
+                string += TILE_CHARS[tile]
+    return string
+
+# decode a string made by encode_board back into a board
+def decode_board(key, grid_size):
+    return [[TILE_CHARS.index(c) or None for c in key[i:i + grid_size]]
+            for i in range(0, grid_size ** 2, grid_size)]
+
+# goal board for any grid size, tiles in order with the blank in the bottom right corner
+def make_goal_board(grid_size):
+    board = [[i * grid_size + j + 1 for j in range(grid_size)] for i in range(grid_size)]
+    board[-1][-1] = None
+    return board
+
+# goal position of every tile (and the blank) for heuristic calculations
+def make_goal_positions(goal_board):
+    return {tile: (i, j) for i, row in enumerate(goal_board) for j, tile in enumerate(row)}
+
+# for each flat blank index, the flat indexes of the tiles that can slide into it (up, down, left, right)
+def move_table(grid_size):
+    table = []
+    for blank in range(grid_size * grid_size):
+        i, j = divmod(blank, grid_size)
+        table.append([x * grid_size + y for x, y in [(i-1, j), (i+1, j), (i, j-1), (i, j+1)]
+                      if 0 <= x < grid_size and 0 <= y < grid_size])
+    return table
+
+# rank a permutation of 0..n-1 by its Lehmer code (its index in lexicographic order)
+def rank_permutation(perm):
+    n = len(perm)
+    rank = 0
+    for i in range(n):                      # each position is one digit of the factorial number system
+        smaller = 0                         # count of later values smaller than this one
+        for j in range(i + 1, n):
+            if perm[j] < perm[i]:
+                smaller += 1
+        rank = rank * (n - i) + smaller     # digit i has base (n - i)
+    return rank
+
+# inverse of rank_permutation, returns the permutation of 0..n-1 with the given rank
+def unrank_permutation(rank, n):
+    digits = []                             # Lehmer digits, least significant first
+    for base in range(1, n + 1):
+        rank, digit = divmod(rank, base)
+        digits.append(digit)
+    remaining = list(range(n))              # values not placed yet
+    perm = []
+    for digit in reversed(digits):
+        perm.append(remaining.pop(digit))
+    return perm
+
+# permutation rank of a board, the blank counts as 0
+def rank_board(board):
+    return rank_permutation([0 if tile is None else tile for row in board for tile in row])
+
 # Helper functions for solvability and random board generation
 def inversion_count(flat):
     flat = [n for n in flat if n is not None]   # ignore the None in the board
@@ -21,21 +90,57 @@ def inversion_count(flat):
                 count += 1                      # increase inversion count
     return count                                # return inversion count
 
-# return True if a board is solvable
+# return True if a board can reach the goal board with the blank in the bottom right corner
+# on odd widths a vertical slide moves a tile past an even number of others, so only the inversion parity matters
+# on even widths it moves past an odd number, so the parity of inversions + blank row is what stays fixed
 def is_solvable(board):
+    grid_size = len(board)
     flat = [tile for row in board for tile in row]  # flatten board completely
     inv = inversion_count(flat)                     # get inversion count
-    return inv % 2 == 0                             # solvable if inversion count is even
-
-# generate a random solvable 3x3 board
-def random_solvable_board(grid_size):
-    flat = [1, 2, 3, 4, 5, 6, 7, 8, None]           # set of tiles in order
-    while True:                                     # keep shuffling until a solvable one is found
-        random.shuffle(flat)                         
-        board = [flat[i:i + grid_size] for i in range(0, grid_size ** 2, grid_size)]
-        if is_solvable(board):                      # if the generated board is solvable
-            return board                            # return board
-        
+    if grid_size % 2 == 1:
+        return inv % 2 == 0                         # solvable if inversion count is even
+    blank_row = flat.index(None) // grid_size
+    return (inv + blank_row) % 2 == (grid_size - 1) % 2    # same parity as the goal (0 inversions, blank on the last row)
+
+# number of solvable boards of a grid size, half of all permutations
+def solvable_count(grid_size):
+    return factorial(grid_size * grid_size) // 2
+
+# the solvable board with the given index (0 <= index < solvable_count), a different board for every index
+# index = pair * cells + blank cell, and the tiles in reading order are the permutation of rank 2 * pair or 2 * pair + 1,
+# whichever is solvable with the blank there: the two only differ by a swap of their last two tiles, so their parities
+# differ, and the parity is the sum of the Lehmer digits, so no inversion count is needed
+def unrank_solvable(index, grid_size):
+    cells = grid_size * grid_size
+    pair, blank = divmod(index, cells)
+    rank = 2 * pair
+    digits = []
+    for base in range(1, cells):
+        rank, digit = divmod(rank, base)
+        digits.append(digit)
+    remaining = list(range(1, cells))
+    tiles = [remaining.pop(digit) for digit in reversed(digits)]
+    if grid_size % 2:
+        parity = 0                                  # odd widths: an even number of inversions
+    else:
+        parity = (grid_size - 1 - blank // grid_size) % 2
+    if sum(digits) % 2 != parity:
+        tiles[-1], tiles[-2] = tiles[-2], tiles[-1]
+    tiles.insert(blank, None)
+    return [tiles[i:i + grid_size] for i in range(0, cells, grid_size)]
+
+# inverse of unrank_solvable
+def rank_solvable(board):
+    flat = [tile for row in board for tile in row]
+    blank = flat.index(None)
+    tiles = [tile - 1 for tile in flat if tile is not None]
+    return rank_permutation(tiles) // 2 * len(flat) + blank
+
+# generate a random solvable board of any size, every solvable board equally likely
+# rng is a random.Random to draw from, e.g. random.Random(seed) for a repeatable board; the global generator if None
+def random_solvable_board(grid_size, rng=None):
+    return unrank_solvable((rng or random).randrange(solvable_count(grid_size)), grid_size)
+
 # Manhattan distance heuristic
 def heuristic_sum(board, grid_size, goal_position):
     total = 0                                                # total Manhattan distance
@@ -81,8 +186,41 @@ def linear_conflict(board, grid_size, goal_positions):
 def heuristic(board, grid_size, goal_positions):
     return heuristic_sum(board, grid_size, goal_positions) + 2 * linear_conflict(board, grid_size, goal_positions)
 
-# generate all possible moves from current board state
-def find_all_moves(board_t, grid_size):
+# number of pairs out of order in a short list
+def count_inversions(values):
+    count = 0
+    for a in range(len(values)):
+        for b in range(a+1, len(values)):
+            if values[a] > values[b]:
+                count += 1
+    return count
+
+# linear conflicts inside row i only
+def row_conflicts(board, i, grid_size, goal_positions):
+    return count_inversions([goal_positions[n][1] for n in board[i] if n is not None and goal_positions[n][0] == i])
+
+# linear conflicts inside column j only
+def col_conflicts(board, j, grid_size, goal_positions):
+    return count_inversions([goal_positions[board[i][j]][0] for i in range(grid_size)
+                             if board[i][j] is not None and goal_positions[board[i][j]][1] == j])
+
+# heuristic of a neighbor worked out from its parent's heuristic
+# a slide moves one tile, so only that tile's Manhattan distance changes, and only the two lines it
+# crosses can change their linear conflicts (a row move changes two columns, a column move two rows)
+def heuristic_delta(parent_t, neighbor_t, parent_h, blank_pos, tile_pos, grid_size, goal_positions):
+    (bi, bj), (ti, tj) = blank_pos, tile_pos
+    gi, gj = goal_positions[parent_t[ti][tj]]                    # goal of the moving tile
+    h = parent_h + abs(gi - bi) + abs(gj - bj) - abs(gi - ti) - abs(gj - tj)
+    if bi == ti:                                                 # horizontal slide, columns tj and bj change
+        h += 2 * (col_conflicts(neighbor_t, tj, grid_size, goal_positions) + col_conflicts(neighbor_t, bj, grid_size, goal_positions)
+                  - col_conflicts(parent_t, tj, grid_size, goal_positions) - col_conflicts(parent_t, bj, grid_size, goal_positions))
+    else:                                                        # vertical slide, rows ti and bi change
+        h += 2 * (row_conflicts(neighbor_t, ti, grid_size, goal_positions) + row_conflicts(neighbor_t, bi, grid_size, goal_positions)
+                  - row_conflicts(parent_t, ti, grid_size, goal_positions) - row_conflicts(parent_t, bi, grid_size, goal_positions))
+    return h
+
+# generate all possible moves from current board state, with the blank position and the position of the tile that slid
+def find_all_moves_with_positions(board_t, grid_size):
     board = tuple_to_board(board_t) # expand tuple back to board
     # Locate the blank
     for i in range(grid_size):
@@ -93,16 +231,31 @@ def find_all_moves(board_t, grid_size):
             else:
                 continue
     # Generate neighbors by sliding tiles into the blank
-    neighbors = []                                      # list of neighbor board tuples
+    neighbors = []                                      # list of (neighbor board tuple, blank position, tile position)
     for dx, dy in [(-1,0),(1,0),(0,-1),(0,1)]:          # up, down, left, right
         x, y = blank_pos[0] + dx, blank_pos[1] + dy     # new position
         if 0 <= x < grid_size and 0 <= y < grid_size:   # if it is a valid position
             # Swap blank and tile
             board[blank_pos[0]][blank_pos[1]], board[x][y] = board[x][y], None
-            neighbors.append(board_to_tuple(board))
+            neighbors.append((board_to_tuple(board), blank_pos, (x, y)))
             # Swap back
             board[blank_pos[0]][blank_pos[1]], board[x][y] = None, board[blank_pos[0]][blank_pos[1]]
-    return neighbors # return list of neighbor board tuples
+    return neighbors
+
+# generate all possible moves from current board state
+def find_all_moves(board_t, grid_size):
+    return [neighbor_t for neighbor_t, _, _ in find_all_moves_with_positions(board_t, grid_size)]  # return list of neighbor board tuples
+
+# same walk as reconstruct_path, but only the move string is kept
+def reconstruct_moves(came_from, current_t, grid_size):
+    blanks = []
+    while True:
+        blanks.append(next(i * grid_size + j for i, row in enumerate(current_t) for j, tile in enumerate(row) if tile is None))
+        if current_t not in came_from:
+            break
+        current_t = came_from[current_t]
+    blanks.reverse()
+    return blank_path_to_string(blanks, grid_size)
 
 def reconstruct_path(came_from, current_t):
     path = [tuple_to_board(current_t)]
@@ -112,13 +265,139 @@ def reconstruct_path(came_from, current_t):
     path.reverse()
     return path
 
+# linear conflicts between a tile (goal gi, gj) at row i, column j of a flat board and the other tiles of its row
+def tile_row_conflicts(flat, i, j, gi, gj, grid_size, goal_positions):
+    if gi != i:                                           # only tiles in their goal row conflict in it
+        return 0
+    conflicts = 0
+    for k in range(grid_size):
+        t = flat[i * grid_size + k]
+        if t and k != j and goal_positions[t][0] == i:
+            if (k < j and goal_positions[t][1] > gj) or (k > j and goal_positions[t][1] < gj):
+                conflicts += 1
+    return conflicts
+
+# same for the other tiles of its column
+def tile_col_conflicts(flat, i, j, gi, gj, grid_size, goal_positions):
+    if gj != j:
+        return 0
+    conflicts = 0
+    for k in range(grid_size):
+        t = flat[k * grid_size + j]
+        if t and k != i and goal_positions[t][1] == j:
+            if (k < i and goal_positions[t][0] > gi) or (k > i and goal_positions[t][0] < gi):
+                conflicts += 1
+    return conflicts
+
+# heuristic after the tile at flat index pos slides into the blank, from the heuristic h before the slide
+# (flat boards may use None or 0 for the blank)
+# only the moving tile's Manhattan distance changes, and only its own conflicts in the
+# column (horizontal slide) or row (vertical slide) it leaves and the one it enters
+def flat_heuristic_delta(flat, blank, pos, h, grid_size, goal_positions):
+    bi, bj = divmod(blank, grid_size)
+    ti, tj = divmod(pos, grid_size)
+    gi, gj = goal_positions[flat[pos]]
+    h += abs(gi - bi) + abs(gj - bj) - abs(gi - ti) - abs(gj - tj)
+    if bi == ti:
+        h += 2 * (tile_col_conflicts(flat, bi, bj, gi, gj, grid_size, goal_positions)
+                  - tile_col_conflicts(flat, ti, tj, gi, gj, grid_size, goal_positions))
+    else:
+        h += 2 * (tile_row_conflicts(flat, bi, bj, gi, gj, grid_size, goal_positions)
+                  - tile_row_conflicts(flat, ti, tj, gi, gj, grid_size, goal_positions))
+    return h
+
+# turn a path of boards into the (tile, direction) moves between them, the same format as knowledge.txt
+def path_to_moves(path):
+    moves = []
+    for a, b in zip(path, path[1:]):
+        ai, aj = next((i, j) for i, row in enumerate(a) for j, tile in enumerate(row) if tile is None)
+        bi, bj = next((i, j) for i, row in enumerate(b) for j, tile in enumerate(row) if tile is None)
+        direction = {(-1, 0): 'up', (1, 0): 'down', (0, -1): 'left', (0, 1): 'right'}[(ai - bi, aj - bj)]
+        moves.append((a[bi][bj], direction))    # the tile next to the blank slides into it
+    return moves
+
+# compact move format: one letter per move for the direction the tile slides, e.g. "LUR"
+# the letters are in the order of the knowledge base's 2 bit direction codes, so a code is an index into MOVE_LETTERS
+MOVE_LETTERS = 'UDLR'
+MOVE_VECTORS = {'U': (-1, 0), 'D': (1, 0), 'L': (0, -1), 'R': (0, 1)}
+
+# compact form of a (tile, direction) move list
+def moves_to_string(moves):
+    if isinstance(moves, str):
+        return moves
+    return ''.join(direction[0].upper() for _, direction in moves)
+
+# move string from the flat cells the blank visits, the tile that fills the blank moves the opposite way
+def blank_path_to_string(blanks, grid_size):
+    letters = {grid_size: 'D', -grid_size: 'U', 1: 'R', -1: 'L'}
+    return ''.join(letters[a - b] for a, b in zip(blanks, blanks[1:]))
+
+# move string -> bytes, laid out like a knowledge base record: the number of moves, then 2 bits per move
+def pack_moves(moves):
+    if len(moves) > 254:
+        raise ValueError("packed move strings hold at most 254 moves")
+    packed = 0
+    for i, letter in enumerate(moves):
+        packed |= MOVE_LETTERS.index(letter) << (2 * i)
+    return bytes([len(moves)]) + packed.to_bytes((2 * len(moves) + 7) // 8, 'little')
+
+# bytes from pack_moves -> move string
+def unpack_moves(data):
+    packed = int.from_bytes(data[1:], 'little')
+    return ''.join(MOVE_LETTERS[(packed >> (2 * i)) & 3] for i in range(data[0]))
+
+# boards from the start board through every move, made one at a time as they are asked for
+# moves is a move string or a (tile, direction) list
+def replay_moves(start_board, moves):
+    board = [list(row) for row in start_board]
+    bi, bj = next((i, j) for i, row in enumerate(board) for j, tile in enumerate(row) if tile is None)
+    yield [row[:] for row in board]
+    for letter in moves_to_string(moves):
+        di, dj = MOVE_VECTORS[letter]
+        ti, tj = bi - di, bj - dj                   # the tile sits on the side opposite the way it slides
+        board[bi][bj], board[ti][tj] = board[ti][tj], None
+        bi, bj = ti, tj
+        yield [row[:] for row in board]
+
 # A* search algorithm
-def a_star_search(start_board, grid_size, goal_positions, goal_board):
+# heuristic_fn replaces the built in Manhattan + linear conflict heuristic, called like heuristic(board, grid_size, goal_positions)
+# A heuristic_fn with initial_state and child_state methods is updated per move instead of worked out for every board:
+#   initial_state(board, grid_size, goal_positions) -> (h, state) for the start board
+#   child_state(state, flat, blank, pos, grid_size, goal_positions) -> (h, state) after the tile at flat index pos
+#   of the flat board slides into the blank (see walking_distance.py). ida_star_search uses it too
+# open_list is the priority queue class, BinaryHeap or BucketQueue
+# return_moves returns the solution as a move string (see MOVE_LETTERS) instead of a list of boards
+# stats is a stats.SearchStats to count into, on_expand(board_t, g, h) is called for every expanded board and
+# on_goal(board_t, g) when the goal is reached. With none of them the search below runs as it always has;
+# with any of them the instrumented copy of it runs instead, so there is no cost when they are not used
+# weight above 1 runs weighted A* (f = g + weight * h) instead: faster, and at most weight times longer than optimal
+# (see anytime.py for searches that keep improving on it). It can't be combined with open_list, stats or the callbacks
+def a_star_search(start_board, grid_size, goal_positions, goal_board, heuristic_fn=None, open_list=BinaryHeap, return_moves=False,
+                  stats=None, on_expand=None, on_goal=None, weight=1):
+    if weight != 1:
+        if open_list is not BinaryHeap or stats is not None or on_expand is not None or on_goal is not None:
+            raise ValueError("weighted A* runs on its own open list and takes no open_list, stats or callbacks")
+        from anytime import ara_star_search
+        found = next(ara_star_search(start_board, grid_size, goal_positions, goal_board, weight=weight, final_weight=weight,
+                                     heuristic_fn=heuristic_fn), None)
+        if found is None or return_moves:
+            return found and found[0]
+        return list(replay_moves(start_board, found[0]))
+    if stats is not None or on_expand is not None or on_goal is not None:
+        return _a_star_search_instrumented(start_board, grid_size, goal_positions, goal_board, heuristic_fn, open_list,
+                                           return_moves, stats, on_expand, on_goal)
     start_t = board_to_tuple(start_board) # flatten start board to tuple
     goal_t = board_to_tuple(goal_board)   # flatten goal board to tuple
     # Perform A* and return the solution path as a list of boards (or None).
-    open_heap = BinaryHeap()                         # priority queue for open set
-    open_heap.push(heuristic(start_board, grid_size, goal_positions), start_t)  # push start node with its f-score
+    open_heap = open_list()                          # priority queue for open set
+    h = heuristic if heuristic_fn is None else heuristic_fn
+    child_state = getattr(heuristic_fn, 'child_state', None)   # incremental heuristic, if it has one
+    states = {}                                                # its state for every board reached
+    if child_state is not None:
+        start_h, states[start_t] = heuristic_fn.initial_state(start_board, grid_size, goal_positions)
+    else:
+        start_h = h(start_board, grid_size, goal_positions)
+    open_heap.push(start_h, start_t)                 # push start node with its f-score
     
     came_from = {}                       # to reconstruct path
     g_score = {start_t: 0}               # cost from start to current node
@@ -126,26 +405,186 @@ def a_star_search(start_board, grid_size, goal_positions, goal_board):
 
     # main loop
     while len(open_heap) > 0:
-        _, current_t = open_heap.pop()
+        current_f, current_t = open_heap.pop()
         # if we popped a stale entry, skip
         if current_t in closed:
             continue
         # current_board = tuple_to_board(current_t)
         current_g = g_score.get(current_t, float('inf'))
+        current_h = current_f - current_g  # the first live pop of a node is the entry pushed with its best g
         # goal check
         if current_t == goal_t:
+            if return_moves:
+                return reconstruct_moves(came_from, current_t, grid_size)
             return reconstruct_path(came_from, current_t)
         # mark current as evaluated
         closed.add(current_t)
+        if child_state is not None:
+            current_flat = [tile for row in current_t for tile in row]
         # explore neighbors
-        for neighbor_t in find_all_moves(current_t, grid_size):
+        for neighbor_t, blank_pos, tile_pos in find_all_moves_with_positions(current_t, grid_size):
             if neighbor_t in closed:      # skip already evaluated
                 continue
             tentative_g = current_g + 1                                  # cost from start to neighbor
             if tentative_g < g_score.get(neighbor_t, float('inf')):      # better path found
                 came_from[neighbor_t] = current_t                        # record best path
                 g_score[neighbor_t] = tentative_g                        # update g-score     
-                f = tentative_g + heuristic(tuple_to_board(neighbor_t), grid_size, goal_positions)  # compute f-score
-                open_heap.push(f, neighbor_t)                            # add neighbor to open set      
+                if heuristic_fn is None:
+                    f = tentative_g + heuristic_delta(current_t, neighbor_t, current_h, blank_pos, tile_pos, grid_size, goal_positions)  # compute f-score from the parent's heuristic
+                elif child_state is not None:
+                    child_h, states[neighbor_t] = child_state(states[current_t], current_flat, blank_pos[0] * grid_size + blank_pos[1],
+                                                              tile_pos[0] * grid_size + tile_pos[1], grid_size, goal_positions)
+                    f = tentative_g + child_h
+                else:
+                    f = tentative_g + heuristic_fn(neighbor_t, grid_size, goal_positions)  # other heuristics are worked out in full
+                open_heap.push(f, neighbor_t, tentative_g)               # add neighbor to open set      
     # no solution found
     return None
+
+# a_star_search with counters and callbacks, keep the two loops in step
+def _a_star_search_instrumented(start_board, grid_size, goal_positions, goal_board, heuristic_fn, open_list,
+                                return_moves, stats, on_expand, on_goal):
+    if stats is None:
+        stats = SearchStats()
+    clock = time.perf_counter
+    search_start = clock()
+    stats.searches += 1
+    start_t = board_to_tuple(start_board)
+    goal_t = board_to_tuple(goal_board)
+    open_heap = open_list()
+    h = heuristic if heuristic_fn is None else heuristic_fn
+    child_state = getattr(heuristic_fn, 'child_state', None)
+    states = {}
+    started = clock()
+    if child_state is not None:
+        start_h, states[start_t] = heuristic_fn.initial_state(start_board, grid_size, goal_positions)
+    else:
+        start_h = h(start_board, grid_size, goal_positions)
+    open_heap.push(start_h, start_t)
+    stats.heuristic_time += clock() - started
+    stats.heuristic_calls += 1
+    stats.peak_open = max(stats.peak_open, 1)
+
+    came_from = {}
+    g_score = {start_t: 0}
+    closed = set()
+    try:
+        while len(open_heap) > 0:
+            current_f, current_t = open_heap.pop()
+            if current_t in closed:
+                stats.stale += 1
+                continue
+            current_g = g_score.get(current_t, float('inf'))
+            current_h = current_f - current_g
+            if current_t == goal_t:
+                if on_goal is not None:
+                    on_goal(current_t, current_g)
+                if return_moves:
+                    return reconstruct_moves(came_from, current_t, grid_size)
+                return reconstruct_path(came_from, current_t)
+            closed.add(current_t)
+            stats.expanded += 1
+            if child_state is not None:
+                current_flat = [tile for row in current_t for tile in row]
+            if on_expand is not None:
+                on_expand(current_t, current_g, current_h)
+            for neighbor_t, blank_pos, tile_pos in find_all_moves_with_positions(current_t, grid_size):
+                stats.generated += 1
+                tentative_g = current_g + 1
+                if neighbor_t in closed:
+                    if tentative_g < g_score[neighbor_t]:
+                        stats.reopened += 1         # counted, but like a_star_search the board is not expanded again
+                    continue
+                best_g = g_score.get(neighbor_t, float('inf'))
+                if tentative_g < best_g:
+                    if best_g != float('inf'):
+                        stats.improved += 1
+                    came_from[neighbor_t] = current_t
+                    g_score[neighbor_t] = tentative_g
+                    started = clock()
+                    if heuristic_fn is None:
+                        f = tentative_g + heuristic_delta(current_t, neighbor_t, current_h, blank_pos, tile_pos, grid_size, goal_positions)
+                    elif child_state is not None:
+                        child_h, states[neighbor_t] = child_state(states[current_t], current_flat,
+                                                                  blank_pos[0] * grid_size + blank_pos[1],
+                                                                  tile_pos[0] * grid_size + tile_pos[1], grid_size, goal_positions)
+                        f = tentative_g + child_h
+                    else:
+                        f = tentative_g + heuristic_fn(neighbor_t, grid_size, goal_positions)
+                    stats.heuristic_time += clock() - started
+                    stats.heuristic_calls += 1
+                    open_heap.push(f, neighbor_t, tentative_g)
+                    if len(open_heap) > stats.peak_open:
+                        stats.peak_open = len(open_heap)
+        return None
+    finally:
+        stats.search_time += clock() - search_start
+
+# IDA* search, same arguments and result as a_star_search
+# depth first search with an f-cost bound that grows each iteration, working on one board in place
+# (a move is undone on the way back) so memory only grows with the depth of the solution
+# an incremental heuristic_fn (see a_star_search) is updated per move, its state passed down the recursion
+def ida_star_search(start_board, grid_size, goal_positions, goal_board, heuristic_fn=None, return_moves=False):
+    if is_solvable(start_board) != is_solvable(goal_board):   # the goal can't be reached, IDA* would never stop
+        return None
+    n = grid_size
+    flat = [tile for row in start_board for tile in row]      # board being searched, changed in place
+    goal = [tile for row in goal_board for tile in row]
+    moves = move_table(grid_size)
+    path = []                                                 # flat positions the blank moved to
+    child_state = getattr(heuristic_fn, 'child_state', None)
+
+    # returns -1 once the goal is found, otherwise the smallest f-cost over the bound
+    # state is the incremental heuristic's state of the board, None without one
+    def search(blank, g, h, state, bound, previous):
+        f = g + h
+        if f > bound:
+            return f
+        if h == 0 and flat == goal:
+            return -1
+        minimum = float('inf')
+        for pos in moves[blank]:
+            if pos == previous:                                   # don't slide the same tile straight back
+                continue
+            tile = flat[pos]
+            child = None
+            if heuristic_fn is None:
+                child_h = flat_heuristic_delta(flat, blank, pos, h, grid_size, goal_positions)
+            elif child_state is not None:
+                child_h, child = child_state(state, flat, blank, pos, grid_size, goal_positions)
+            flat[blank], flat[pos] = tile, None                   # make the move
+            if heuristic_fn is not None and child_state is None:
+                child_h = heuristic_fn([flat[i:i + n] for i in range(0, n * n, n)], grid_size, goal_positions)
+            path.append(pos)
+            t = search(pos, g + 1, child_h, child, bound, blank)
+            if t == -1:
+                return -1
+            path.pop()
+            flat[pos], flat[blank] = tile, None                   # undo the move
+            if t < minimum:
+                minimum = t
+        return minimum
+
+    blank = flat.index(None)
+    start_state = None
+    if child_state is not None:
+        start_h, start_state = heuristic_fn.initial_state(start_board, grid_size, goal_positions)
+    else:
+        start_h = (heuristic if heuristic_fn is None else heuristic_fn)(start_board, grid_size, goal_positions)
+    bound = start_h
+    while True:
+        t = search(blank, 0, start_h, start_state, bound, None)
+        if t == -1:
+            break
+        bound = t                                                 # next iteration allows the smallest f that was cut off
+    if return_moves:
+        return blank_path_to_string([blank] + path, grid_size)
+
+    # replay the blank's moves from the start board to build the board path
+    board = [tile for row in start_board for tile in row]
+    result = [[board[i:i + n] for i in range(0, n * n, n)]]
+    for pos in path:
+        board[blank], board[pos] = board[pos], None
+        blank = pos
+        result.append([board[i:i + n] for i in range(0, n * n, n)])
+    return result
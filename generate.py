@@ -0,0 +1,89 @@
+# board generation
+# uniformly random solvable boards, or boards with a given optimal solution length, one encode_board line each:
+#   python generate.py 1000000 --size 4 --seed 1 > boards.txt
+#   python generate.py 1000 --depth 20 --knowledge knowledge.bin > graded.txt
+# Random boards are drawn as a random index among the solvable boards and unranked (see unrank_solvable), so there is
+# no rejection and no inversion count. Graded boards come from the knowledge base, whose records already hold every
+# board's optimal length, so nothing has to be solved to grade them.
+import sys
+import random
+import argparse
+from functions import TILE_CHARS, encode_board, unrank_permutation, random_solvable_board
+from knowledge import open_knowledge, SymmetricKnowledgeBase
+from symmetry import transpose_board
+
+# the boards of a knowledge base grouped by optimal solution length, as lists of ranks
+class DepthIndex:
+    def __init__(self, knowledge_path='knowledge.bin'):
+        self.by_depth = {}
+        with open_knowledge(knowledge_path) as kb:
+            self.rows, self.cols = kb.rows, kb.cols
+            self.symmetric = isinstance(kb, SymmetricKnowledgeBase)
+            for rank, length in kb.depths():
+                self.by_depth.setdefault(length, []).append(rank)
+
+    # {depth: number of stored boards}; a symmetric file stores one board of each mirrored pair
+    def counts(self):
+        return {depth: len(ranks) for depth, ranks in sorted(self.by_depth.items())}
+
+    def _board(self, rank):
+        perm = unrank_permutation(rank, self.rows * self.cols)
+        return [[tile or None for tile in perm[i:i + self.cols]] for i in range(0, self.rows * self.cols, self.cols)]
+
+    # count uniformly random boards whose optimal solution is depth moves long (repeats are possible)
+    # a symmetric file only stores canonical boards, so half of the draws are mirrored, and a board that is its own
+    # mirror is only kept half of the time, which gives every board at that depth the same chance
+    def sample(self, depth, count, rng=None):
+        rng = rng or random
+        ranks = self.by_depth.get(depth)
+        if not ranks:
+            raise ValueError(f"no boards with an optimal solution of {depth} moves")
+        boards = []
+        while len(boards) < count:
+            board = self._board(rng.choice(ranks))
+            if self.symmetric:
+                transposed = transpose_board(board)
+                if transposed == board:
+                    if rng.random() < 0.5:
+                        continue
+                elif rng.random() < 0.5:
+                    board = transposed
+            boards.append(board)
+        return boards
+
+# encode_board keys of count random boards; NumPy does the work for boards up to 4x4
+def random_keys(count, grid_size, seed=None):
+    if grid_size <= 4:
+        from vectorized import random_boards
+        for row in random_boards(count, grid_size, seed):
+            yield ''.join(TILE_CHARS[tile] for tile in row)
+    else:
+        rng = random.Random(seed)
+        for _ in range(count):
+            yield encode_board(random_solvable_board(grid_size, rng))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate solvable sliding tile puzzle boards.")
+    parser.add_argument('count', type=int, help="number of boards")
+    parser.add_argument('--size', type=int, default=3, help="grid size of random boards")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--depth', type=int, help="optimal solution length, boards are drawn from the knowledge base")
+    parser.add_argument('--knowledge', default='knowledge.bin', help="knowledge base used with --depth")
+    parser.add_argument('--output', help="write the boards here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.depth is not None:
+        index = DepthIndex(args.knowledge)
+        keys = map(encode_board, index.sample(args.depth, args.count, random.Random(args.seed)))
+    else:
+        keys = random_keys(args.count, args.size, args.seed)
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for key in keys:
+            out.write(key + "\n")
+    finally:
+        if args.output:
+            out.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# custom goals
+# the knowledge base only solves towards the standard goal (tiles in order, blank in the bottom right corner),
+# but it answers any goal with the blank in a corner:
+#   - flip the board and the goal upside down and/or left to right so the goal's blank lands in the bottom right corner.
+#     A flipped board slides the same tiles, with up <-> down and/or left <-> right swapped in its moves
+#   - relabel every tile as the standard goal's tile on the cell where the flipped goal has it, which turns the
+#     flipped goal into the standard goal without changing which moves solve the board
+# so solving towards the custom goal is one relabeling and one lookup. Goals with the blank anywhere else have no
+# symmetry that takes it to a corner and are searched for instead.
+#   goal = CustomGoal([[None, 1, 2], [3, 4, 5], [6, 7, 8]])
+#   moves = goal.solve(board, kb)
+from functions import *
+
+FLIPPED_ROWS_LETTERS = str.maketrans('UDLR', 'DULR')   # moves of a board flipped upside down
+FLIPPED_COLS_LETTERS = str.maketrans('UDLR', 'UDRL')   # moves of a board flipped left to right
+
+class CustomGoal:
+    def __init__(self, goal_board):
+        self.goal_board = [list(row) for row in goal_board]
+        self.grid_size = len(goal_board)
+        self.goal_positions = make_goal_positions(self.goal_board)
+        self.solvable = is_solvable(self.goal_board)    # boards reach this goal only if is_solvable agrees
+        last = self.grid_size - 1
+        bi, bj = self.goal_positions[None]
+        self.corner = bi in (0, last) and bj in (0, last)
+        self.flip_rows = bi == 0                        # flips that bring the goal's blank to the bottom right
+        self.flip_cols = bj == 0
+        standard = make_goal_board(self.grid_size)
+        flipped = self.flip(self.goal_board)
+        self.labels = {flipped[i][j]: standard[i][j] for i in range(self.grid_size) for j in range(self.grid_size)}
+
+    # the board with this goal's flips applied (each flip is its own inverse)
+    def flip(self, board):
+        rows = board[::-1] if self.flip_rows else board
+        return [row[::-1] if self.flip_cols else list(row) for row in rows]
+
+    # the board that needs the same moves to reach the standard goal as this board needs to reach this goal
+    # (only when the goal's blank is in a corner)
+    def to_standard(self, board):
+        return [[self.labels[tile] for tile in row] for row in self.flip(board)]
+
+    # moves that solve to_standard(board) -> moves that take the board to this goal
+    def moves_from_standard(self, moves):
+        if self.flip_rows:
+            moves = moves.translate(FLIPPED_ROWS_LETTERS)
+        if self.flip_cols:
+            moves = moves.translate(FLIPPED_COLS_LETTERS)
+        return moves
+
+    # move string that takes the board to this goal, or None if it can't reach it
+    # knowledge is an open knowledge base, used when it covers the board's size and the goal's blank is in a corner;
+    # otherwise search (called like a_star_search) finds the moves
+    def solve(self, board, knowledge=None, search=a_star_search):
+        if is_solvable(board) != self.solvable:
+            return None
+        if (knowledge is not None and self.corner and knowledge.rows == knowledge.cols == self.grid_size):
+            moves = knowledge.lookup_string(self.to_standard(board))
+            if moves is not None:
+                return self.moves_from_standard(moves)
+        return search(board, self.grid_size, self.goal_positions, self.goal_board, return_moves=True)
+
+# move string that takes the board to goal_board, see CustomGoal.solve
+def solve_for_goal(board, goal_board, knowledge=None, search=a_star_search):
+    return CustomGoal(goal_board).solve(board, knowledge, search)
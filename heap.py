@@ -5,7 +5,8 @@ class BinaryHeap:
         self.heap = []
         self._counter = 0
 
-    def push(self, heuristic, board):
+    # g is only there so the call matches BucketQueue.push
+    def push(self, heuristic, board, g=0):
         heapq.heappush(self.heap, (heuristic, self._counter, board))
         self._counter += 1
 
@@ -16,4 +17,43 @@ class BinaryHeap:
         return (h, board)
 
     def __len__(self):
-        return len(self.heap)
\ No newline at end of file
+        return len(self.heap)
+
+# open list for searches where f-scores are small whole numbers (every move costs 1)
+# buckets[f][g] is a stack of boards, so push and pop are O(1) and nothing is wrapped in a tuple;
+# pop takes the lowest f, then the highest g (the node closest to the goal), then the newest board
+class BucketQueue:
+    def __init__(self):
+        self.buckets = []
+        self.min_f = 0           # no bucket below this holds anything
+        self.size = 0
+        self.peak_size = 0       # largest size the queue reached
+
+    def push(self, heuristic, board, g=0):
+        while len(self.buckets) <= heuristic:
+            self.buckets.append([])
+        bucket = self.buckets[heuristic]
+        while len(bucket) <= g:
+            bucket.append([])
+        bucket[g].append(board)
+        if heuristic < self.min_f:
+            self.min_f = heuristic
+        self.size += 1
+        if self.size > self.peak_size:
+            self.peak_size = self.size
+
+    def pop(self):
+        if not self.size:
+            return None
+        while True:
+            bucket = self.buckets[self.min_f]
+            while bucket and not bucket[-1]:     # drop emptied stacks from the top, so the highest g is always last
+                bucket.pop()
+            if bucket:
+                break
+            self.min_f += 1
+        self.size -= 1
+        return (self.min_f, bucket[-1].pop())
+
+    def __len__(self):
+        return self.size
@@ -16,9 +16,11 @@ SELECTED_COLOR = (128, 128, 128)  # color for selected tile
 TILE_COLOR = (52, 138, 82)        # tile color
 TEXT_COLOR = (255, 255, 255)      # text color
 
+GOAL_BOARD = make_goal_board(GRID_SIZE)  # solved board
+
 # get possible moves for tile n
 def get_moves(n):
-    if n is not None and 1 <= n <= 9:       # input validation
+    if n is not None and 1 <= n < GRID_SIZE ** 2:   # input validation
         location = (None, None)             # empty location tuple
         moves = []                          # moves array
 
@@ -117,7 +119,7 @@ while True:
                 # Reset selection regardless
                 current_clicked = None
                 available_moves = []
-    if tile_set == [[1, 2, 3], [4, 5, 6], [7, 8, None]]:
+    if tile_set == GOAL_BOARD:
         print("puzzle complete")
         print(f"moves: {moves}")
         break
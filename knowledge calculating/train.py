@@ -1,7 +1,7 @@
 import os, sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from heap import BinaryHeap
-from functions import tuple_to_board, board_to_tuple, heuristic, find_all_moves, reconstruct_path
+from functions import tuple_to_board, board_to_tuple, heuristic, find_all_moves, reconstruct_path, make_goal_board, make_goal_positions
 
 TILE_SIZE = 100
 GRID_SIZE = 3
@@ -13,16 +13,10 @@ TILE_COLOR = (52, 138, 82)      # tile color
 TEXT_COLOR = (255, 255, 255)    # text color
 
 # Define goal state
-GOAL_BOARD = [
-    [1, 2, 3],
-    [4, 5, 6],
-    [7, 8, None]
-]
+GOAL_BOARD = make_goal_board(GRID_SIZE)
 
 # Precompute goal positions for heuristic calculations
-GOAL_POSITIONS = {1: (0, 0), 2: (0, 1), 3: (0, 2),
-                  4: (1, 0), 5: (1, 1), 6: (1, 2),
-                  7: (2, 0), 8: (2, 1), None: (2, 2)}
+GOAL_POSITIONS = make_goal_positions(GOAL_BOARD)
 
 # get the move done to get from board_a to board_b
 def get_move_between(board_a, board_b):
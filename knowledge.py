@@ -0,0 +1,281 @@
+# knowledge base
+# binary version of knowledge.txt: one fixed width record per board, stored at the board's permutation rank
+# so finding the moves for a board is a single seek instead of a scan through the whole text file
+import os
+import sys
+import ast
+import mmap
+import struct
+import zipfile
+from math import factorial
+from functions import rank_board, unrank_permutation, MOVE_LETTERS
+from symmetry import canonical_board, transpose_board, TRANSPOSED_CODES
+
+# file layout: header, then factorial(rows * cols) records of record_size bytes
+# each record is [number of moves][moves packed 2 bits each, first move in the lowest bits]
+MAGIC = b'STPK'                             # file signature
+VERSION = 1                                 # format version
+HEADER = struct.Struct('<4sBBBB')           # magic, version, rows, cols, record size
+NO_ENTRY = 0xFF                             # length byte of boards with no solution
+
+# symmetry reduced layout (see symmetry.py): header, the number of boards stored, their ranks in ascending order,
+# then one record per stored rank. Only canonical boards are kept, and boards with no solution are left out
+SYMMETRIC_VERSION = 2
+COUNT = struct.Struct('<I')                 # number of boards stored
+RANK = struct.Struct('<I')                  # one stored rank
+
+# direction the moved tile travels, in the order of their 2 bit codes
+DIRECTIONS = ['up', 'down', 'left', 'right']
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+DIRECTION_VECTORS = {
+    "up":(-1, 0),
+    "down":(1, 0),
+    "left":(0, -1),
+    "right":(0, 1)
+}
+
+# pack a list of direction codes into a record
+def pack_record(codes, record_size):
+    packed = 0
+    for i, code in enumerate(codes):
+        packed |= code << (2 * i)
+    return bytes([len(codes)]) + packed.to_bytes(record_size - 1, 'little')
+
+# unpack a record back into a list of direction codes (None if the board has no entry)
+def unpack_record(record):
+    length = record[0]
+    if length == NO_ENTRY:
+        return None
+    packed = int.from_bytes(record[1:], 'little')
+    return [(packed >> (2 * i)) & 3 for i in range(length)]
+
+# turn direction codes into (tile, direction) moves by replaying them on a flat copy of the board
+def codes_to_moves(board, codes):
+    cols = len(board[0])
+    flat = [tile for row in board for tile in row]
+    blank = flat.index(None)
+    moves = []
+    for code in codes:
+        direction = DIRECTIONS[code]
+        di, dj = DIRECTION_VECTORS[direction]
+        tile_pos = blank - (di * cols + dj)                 # the tile moving into the blank sits opposite to its direction
+        moves.append((flat[tile_pos], direction))
+        flat[blank], flat[tile_pos] = flat[tile_pos], None
+        blank = tile_pos
+    return moves
+
+# read (key, moves) pairs from knowledge.txt, or from inside knowledge.zip
+def read_text_knowledge(path):
+    if path.endswith('.zip'):
+        with zipfile.ZipFile(path) as archive:
+            with archive.open('knowledge.txt') as f:
+                for line in f:
+                    key, moves_str = line.decode().strip().split(':', 1)
+                    yield key, ast.literal_eval(moves_str)
+    else:
+        with open(path, 'r') as f:
+            for line in f:
+                key, moves_str = line.strip().split(':', 1)
+                yield key, ast.literal_eval(moves_str)
+
+# convert knowledge.txt (or knowledge.zip) into the binary format
+def convert_knowledge(src, dst):
+    entries = []                                            # (rank, direction codes)
+    grid_size = None
+    for key, moves in read_text_knowledge(src):
+        if grid_size is None:
+            grid_size = int(round(len(key) ** 0.5))
+        perm = [int(c) for c in key]
+        entries.append((rank_board([perm]), [DIRECTION_CODES[direction] for _, direction in moves]))
+
+    longest = max(len(codes) for _, codes in entries)
+    record_size = 1 + (2 * longest + 7) // 8                # length byte + packed moves
+    count = factorial(grid_size * grid_size)
+    records = bytearray(b'\xff' * record_size) * count      # every rank starts out with no entry
+    for rank, codes in entries:
+        start = rank * record_size
+        records[start:start + record_size] = pack_record(codes, record_size)
+
+    with open(dst, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, grid_size, grid_size, record_size))
+        f.write(records)
+    return len(entries)
+
+# write a symmetry reduced copy of a knowledge base file
+def reduce_knowledge(src, dst):
+    with KnowledgeBase(src) as kb:
+        if kb.rows != kb.cols:
+            raise ValueError("only square boards are symmetric across the diagonal")
+        cells = kb.rows * kb.cols
+        ranks = []
+        records = []
+        for rank in range(factorial(cells)):
+            record = kb._read_record(rank)
+            if record[0] == NO_ENTRY:
+                continue
+            perm = unrank_permutation(rank, cells)
+            board = [[t or None for t in perm[i:i + kb.cols]] for i in range(0, cells, kb.cols)]
+            if rank_board(transpose_board(board)) >= rank:      # canonical, or its own mirror image
+                ranks.append(rank)
+                records.append(record)
+        with open(dst, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, SYMMETRIC_VERSION, kb.rows, kb.cols, kb.record_size))
+            f.write(COUNT.pack(len(ranks)))
+            for rank in ranks:
+                f.write(RANK.pack(rank))
+            f.write(b''.join(records))
+    return len(ranks)
+
+# lookup API for the binary knowledge base
+class KnowledgeBase:
+    version = VERSION
+
+    def __init__(self, path='knowledge.bin'):
+        self.file = open(path, 'rb')
+        magic, version, self.rows, self.cols, self.record_size = HEADER.unpack(self.file.read(HEADER.size))
+        if magic != MAGIC or version != self.version:
+            self.file.close()
+            raise ValueError(f"{path} is not a knowledge base file")
+
+    # raw record stored at a rank
+    def _read_record(self, rank):
+        self.file.seek(HEADER.size + rank * self.record_size)
+        return self.file.read(self.record_size)
+
+    # True if the board has the rows and columns this knowledge base was built for
+    def fits(self, board):
+        return len(board) == self.rows and all(len(row) == self.cols for row in board)
+
+    # ValueError for a board of another size, its rank would point at some other board's record
+    def _check_size(self, board):
+        if not self.fits(board):
+            raise ValueError(f"knowledge base holds {self.rows}x{self.cols} boards")
+
+    # direction codes that solve the board, or None if it is not in the knowledge base
+    def lookup_codes(self, board):
+        self._check_size(board)
+        return unpack_record(self._read_record(rank_board(board)))
+
+    # list of (tile, direction) moves that solve the board, same as a line of knowledge.txt
+    def lookup(self, board):
+        codes = self.lookup_codes(board)
+        if codes is None:
+            return None
+        return codes_to_moves(board, codes)
+
+    # the moves as a move string, the same result type the searches give with return_moves
+    def lookup_string(self, board):
+        codes = self.lookup_codes(board)
+        if codes is None:
+            return None
+        return ''.join(MOVE_LETTERS[code] for code in codes)
+
+    def __contains__(self, board):
+        return self.fits(board) and self._read_record(rank_board(board))[0] != NO_ENTRY
+
+    # (rank, number of moves) of every board in the knowledge base, in rank order
+    def depths(self):
+        for rank in range(factorial(self.rows * self.cols)):
+            length = self._read_record(rank)[0]
+            if length != NO_ENTRY:
+                yield rank, length
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# read-only memory mapped knowledge base
+# every process that maps the same file shares one copy of it in the page cache,
+# and opening it only reads the header so start up does not depend on the file size
+class MappedKnowledgeBase(KnowledgeBase):
+    def __init__(self, path='knowledge.bin'):
+        super().__init__(path)
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # slice the record straight out of the mapping, no seek or read call needed
+    def _read_record(self, rank):
+        start = HEADER.size + rank * self.record_size
+        return self.map[start:start + self.record_size]
+
+    def close(self):
+        self.map.close()
+        super().close()
+
+# symmetry reduced knowledge base, memory mapped read-only
+# a board is looked up as its canonical board, found by binary search over the stored ranks,
+# and moves stored for the transposed board are mapped back before they are returned
+class SymmetricKnowledgeBase(KnowledgeBase):
+    version = SYMMETRIC_VERSION
+
+    def __init__(self, path='knowledge.bin'):
+        super().__init__(path)
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = COUNT.unpack_from(self.map, HEADER.size)[0]
+        self.ranks_offset = HEADER.size + COUNT.size
+        self.records_offset = self.ranks_offset + self.count * RANK.size
+
+    # index of a rank among the stored ranks, or None
+    def _find(self, rank):
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            if RANK.unpack_from(self.map, self.ranks_offset + mid * RANK.size)[0] < rank:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self.count and RANK.unpack_from(self.map, self.ranks_offset + low * RANK.size)[0] == rank:
+            return low
+        return None
+
+    # record of a stored rank, or a no entry record
+    def _read_record(self, rank):
+        index = self._find(rank)
+        if index is None:
+            return bytes([NO_ENTRY])
+        start = self.records_offset + index * self.record_size
+        return self.map[start:start + self.record_size]
+
+    def lookup_codes(self, board):
+        self._check_size(board)
+        canonical, transposed = canonical_board(board)
+        codes = unpack_record(self._read_record(rank_board(canonical)))
+        if codes is not None and transposed:
+            codes = [TRANSPOSED_CODES[code] for code in codes]
+        return codes
+
+    def __contains__(self, board):
+        return self.fits(board) and self._find(rank_board(canonical_board(board)[0])) is not None
+
+    # (rank, number of moves) of every stored board, canonical boards only
+    def depths(self):
+        for index in range(self.count):
+            rank = RANK.unpack_from(self.map, self.ranks_offset + index * RANK.size)[0]
+            yield rank, self.map[self.records_offset + index * self.record_size]
+
+    def close(self):
+        self.map.close()
+        super().close()
+
+# open a knowledge base file of either layout, full files are memory mapped
+def open_knowledge(path='knowledge.bin'):
+    with open(path, 'rb') as f:
+        version = HEADER.unpack(f.read(HEADER.size))[1]
+    if version == SYMMETRIC_VERSION:
+        return SymmetricKnowledgeBase(path)
+    return MappedKnowledgeBase(path)
+
+# python knowledge.py [knowledge.zip] [knowledge.bin] [--symmetric]
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if arg != '--symmetric']
+    src = args[0] if len(args) > 0 else 'knowledge.zip'
+    dst = args[1] if len(args) > 1 else 'knowledge.bin'
+    count = convert_knowledge(src, dst)
+    if '--symmetric' in sys.argv:
+        count = reduce_knowledge(dst, dst + '.tmp')
+        os.replace(dst + '.tmp', dst)
+    print(f"wrote {count} boards to {dst} ({os.path.getsize(dst)} bytes)")
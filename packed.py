@@ -0,0 +1,175 @@
+# packed board engine
+# stores a whole board in one integer (4 bits per cell, blank index kept above the cells)
+# so A* hashes and compares plain ints and makes neighbors with precomputed shifts instead of copying lists
+from heap import BinaryHeap
+from functions import move_table, count_inversions, blank_path_to_string
+
+class PackedBoards:
+    def __init__(self, grid_size, goal_positions):
+        self.grid_size = grid_size
+        self.cells = grid_size * grid_size
+        self.bits = max(4, (self.cells - 1).bit_length())   # 4 bits per cell, more for boards past 4x4
+        self.mask = (1 << self.bits) - 1
+        self.blank_shift = self.bits * self.cells           # the blank index is stored above the cells
+
+        self.row_bits = self.bits * grid_size
+        self.row_mask = (1 << self.row_bits) - 1
+        self.row_cache = [{} for _ in range(grid_size)]     # row bits -> linear conflicts, one dict per row
+        self.col_cache = [{} for _ in range(grid_size)]     # column bits -> linear conflicts, one dict per column
+        self.cell_row = [pos // grid_size for pos in range(self.cells)]
+        self.cell_col = [pos % grid_size for pos in range(self.cells)]
+        self.col_masks = [sum(self.mask << ((i * grid_size + j) * self.bits) for i in range(grid_size))
+                          for j in range(grid_size)]        # the bits of each column's cells
+
+        # goal row, column and Manhattan distance of each tile from each position (blank is tile 0)
+        self.goal_row = [0] * self.cells
+        self.goal_col = [0] * self.cells
+        self.distance = [[0] * self.cells for _ in range(self.cells)]
+        for tile, (gi, gj) in goal_positions.items():
+            if tile is None:
+                continue
+            self.goal_row[tile] = gi
+            self.goal_col[tile] = gj
+            for pos in range(self.cells):
+                i, j = divmod(pos, grid_size)
+                self.distance[tile][pos] = abs(gi - i) + abs(gj - j)
+
+        # move table: for each blank index, (tile index, tile shift, blank shift, change of blank index)
+        self.moves = []
+        for blank, positions in enumerate(move_table(grid_size)):
+            self.moves.append([(pos, pos * self.bits, blank * self.bits, (pos - blank) << self.blank_shift)
+                               for pos in positions])
+
+    # board (list of lists) -> packed int
+    def pack(self, board):
+        state = 0
+        blank = 0
+        for pos, tile in enumerate(tile for row in board for tile in row):
+            if tile is None:
+                blank = pos
+            else:
+                state |= tile << (pos * self.bits)
+        return state | (blank << self.blank_shift)
+
+    # packed int -> flat list of tiles, blank as 0
+    def unpack_flat(self, state):
+        return [(state >> (pos * self.bits)) & self.mask for pos in range(self.cells)]
+
+    # packed int -> board (list of lists)
+    def unpack(self, state):
+        flat = [tile or None for tile in self.unpack_flat(state)]
+        return [flat[i:i + self.grid_size] for i in range(0, self.cells, self.grid_size)]
+
+    # (neighbor, blank index, index of the tile that slid) of every state one slide away
+    def moves_from(self, state):
+        mask = self.mask
+        blank = state >> self.blank_shift
+        result = []
+        for pos, tile_shift, blank_shift, blank_delta in self.moves[blank]:
+            tile = (state >> tile_shift) & mask
+            result.append((state - (tile << tile_shift) + (tile << blank_shift) + blank_delta, blank, pos))
+        return result
+
+    # all states one slide away
+    def neighbors(self, state):
+        mask = self.mask
+        result = []
+        for pos, tile_shift, blank_shift, blank_delta in self.moves[state >> self.blank_shift]:
+            tile = (state >> tile_shift) & mask
+            # clear the tile's cell, write it into the blank's cell and move the blank index
+            result.append(state - (tile << tile_shift) + (tile << blank_shift) + blank_delta)
+        return result
+
+    # linear conflicts in row i, memoized on the row's bits since the cells of a row are contiguous
+    def row_conflicts(self, state, i):
+        key = (state >> (i * self.row_bits)) & self.row_mask
+        conflicts = self.row_cache[i].get(key)
+        if conflicts is None:
+            tiles = [(key >> (j * self.bits)) & self.mask for j in range(self.grid_size)]
+            conflicts = count_inversions([self.goal_col[t] for t in tiles if t and self.goal_row[t] == i])
+            self.row_cache[i][key] = conflicts
+        return conflicts
+
+    # linear conflicts in column j, memoized on the column's bits left in place
+    def col_conflicts(self, state, j):
+        key = state & self.col_masks[j]
+        conflicts = self.col_cache[j].get(key)
+        if conflicts is None:
+            tiles = [(key >> ((i * self.grid_size + j) * self.bits)) & self.mask for i in range(self.grid_size)]
+            conflicts = count_inversions([self.goal_row[t] for t in tiles if t and self.goal_col[t] == j])
+            self.col_cache[j][key] = conflicts
+        return conflicts
+
+    # same value as functions.heuristic: Manhattan distance + 2 * linear conflicts
+    def heuristic(self, state):
+        flat = self.unpack_flat(state)
+        distance = self.distance
+        total = 0
+        for pos, tile in enumerate(flat):
+            if tile:
+                total += distance[tile][pos]
+        conflicts = 0
+        for i in range(self.grid_size):
+            conflicts += self.row_conflicts(state, i) + self.col_conflicts(state, i)
+        return total + 2 * conflicts
+
+    # heuristic of the neighbor made by sliding the tile at pos into the blank, from the state's heuristic h
+    # like functions.flat_heuristic_delta: only the moving tile's distance changes, and only the conflicts of the line
+    # it belongs in can change, if that is one of the two columns (horizontal slide) or rows (vertical slide) it moves between
+    def heuristic_delta(self, state, h, neighbor, blank, pos):
+        tile = (state >> (pos * self.bits)) & self.mask
+        h += self.distance[tile][blank] - self.distance[tile][pos]
+        cell_row, cell_col = self.cell_row, self.cell_col
+        if cell_row[blank] == cell_row[pos]:
+            j = self.goal_col[tile]
+            if j == cell_col[blank] or j == cell_col[pos]:
+                h += 2 * (self.col_conflicts(neighbor, j) - self.col_conflicts(state, j))
+        else:
+            i = self.goal_row[tile]
+            if i == cell_row[blank] or i == cell_row[pos]:
+                h += 2 * (self.row_conflicts(neighbor, i) - self.row_conflicts(state, i))
+        return h
+
+# A* on packed boards, takes and returns the same things as functions.a_star_search
+def a_star_search_packed(start_board, grid_size, goal_positions, goal_board, heuristic_fn=None, open_list=BinaryHeap, return_moves=False):
+    space = PackedBoards(grid_size, goal_positions)
+    if heuristic_fn is None:
+        h = space.heuristic
+        child_h = space.heuristic_delta  # worked out from the parent's h
+    else:                                # other heuristics get the unpacked board
+        h = lambda state: heuristic_fn(space.unpack(state), grid_size, goal_positions)
+        child_h = lambda state, parent_h, neighbor, blank, pos: h(neighbor)
+    start = space.pack(start_board)
+    goal = space.pack(goal_board)
+    open_heap = open_list()
+    open_heap.push(h(start), start)
+
+    came_from = {}                       # int -> int
+    g_score = {start: 0}                 # int -> int
+    closed = set()                       # set of ints
+
+    while len(open_heap) > 0:
+        current_f, current = open_heap.pop()
+        if current in closed:            # stale entry
+            continue
+        if current == goal:
+            path = [current]
+            while current in came_from:
+                current = came_from[current]
+                path.append(current)
+            path.reverse()
+            if return_moves:
+                return blank_path_to_string([state >> space.blank_shift for state in path], grid_size)
+            return [space.unpack(state) for state in path]
+        closed.add(current)
+        current_g = g_score[current]
+        current_h = current_f - current_g    # the first live pop of a state is the entry pushed with its best g
+        tentative_g = current_g + 1
+        for neighbor, blank, pos in space.moves_from(current):
+            if neighbor in closed:
+                continue
+            if tentative_g < g_score.get(neighbor, float('inf')):
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative_g
+                open_heap.push(tentative_g + child_h(current, current_h, neighbor, blank, pos), neighbor, tentative_g)
+    return None
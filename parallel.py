@@ -0,0 +1,194 @@
+# parallel A*
+# HDA* (hash distributed A*): every worker process owns the boards whose hash maps to it and runs its own A* on them.
+# A board made by expanding one of your boards is sent to its owner, batched per owner, over that owner's queue,
+# so each board's g-score, parent and closed flag live in exactly one process and no locks are needed.
+# The best solution length found so far is shared; a worker skips any board whose f can't beat it.
+# The search is over when every worker is idle (nothing left with f below the best solution) and every batch that
+# was sent has been received. That is checked from the main process by reading the send and receive counters
+# twice around the idle flags, and at that point the best solution is optimal.
+#   path = hda_star_search(board, 4, goal_positions, goal_board, workers=32)
+import os
+import time
+import heapq
+import queue
+import multiprocessing
+from packed import PackedBoards
+from functions import is_solvable, blank_path_to_string
+
+INFINITY = 1 << 30
+EXPAND_STEP = 64                # boards expanded between two looks at the inbox
+
+# worker owning a packed board: a multiplicative hash, so the cells that change on every move decide it
+def owner(state, workers):
+    return ((state * 0x9E3779B97F4A7C15) >> 40) % workers
+
+# one worker process
+def _worker(index, workers, grid_size, goal_positions, goal, inboxes, results, incumbent, sent, received, idle, batch_size):
+    space = PackedBoards(grid_size, goal_positions)
+    inbox = inboxes[index]
+    open_heap = []                  # (f, -g, state), deeper boards first among equal f
+    g_score = {}
+    parent = {}
+    closed = set()
+    outboxes = [[] for _ in range(workers)]
+    expanded = 0
+
+    def send(dest):
+        sent[index] += 1            # counted before it is put, so it is never received before it is counted
+        inboxes[dest].put(('nodes', outboxes[dest]))
+        outboxes[dest] = []
+
+    def add(state, g, previous):
+        if g < g_score.get(state, INFINITY):
+            g_score[state] = g
+            parent[state] = previous
+            closed.discard(state)
+            f = g + space.heuristic(state)
+            if f < best:
+                heapq.heappush(open_heap, (f, -g, state))
+
+    # False when told to stop
+    def handle(message):
+        kind, payload = message
+        if kind == 'nodes':
+            for state, g, previous in payload:
+                add(state, g, previous)
+        elif kind == 'parent':
+            results.put(parent.get(payload))
+        elif kind == 'stop':
+            results.put(expanded)
+            return False
+        return True
+
+    best = INFINITY                 # local copy of the incumbent, read once per round
+    while True:
+        best = incumbent.value
+        while True:                                         # everything already waiting
+            try:
+                message = inbox.get_nowait()
+            except queue.Empty:
+                break
+            idle[index] = 0
+            if not handle(message):
+                return
+            received[index] += 1
+        for _ in range(EXPAND_STEP):
+            if not open_heap or open_heap[0][0] >= best:
+                break
+            f, g, state = heapq.heappop(open_heap)
+            g = -g
+            if state in closed or g != g_score[state]:
+                continue                                    # stale entry
+            closed.add(state)
+            expanded += 1
+            if state == goal:
+                with incumbent.get_lock():
+                    if g < incumbent.value:
+                        incumbent.value = g
+                    best = incumbent.value
+                continue
+            previous = parent[state]
+            for neighbor in space.neighbors(state):
+                if neighbor == previous:                    # sliding the same tile back never helps
+                    continue
+                dest = owner(neighbor, workers)
+                if dest == index:
+                    add(neighbor, g + 1, state)
+                else:
+                    outboxes[dest].append((neighbor, g + 1, state))
+                    if len(outboxes[dest]) >= batch_size:
+                        send(dest)
+        if open_heap and open_heap[0][0] < best:
+            continue
+        # out of local work: send whatever is batched, then wait for more
+        for dest in range(workers):
+            if outboxes[dest]:
+                send(dest)
+        idle[index] = 1
+        message = inbox.get()
+        idle[index] = 0
+        if not handle(message):
+            return
+        received[index] += 1
+
+# RuntimeError if a worker process died, e.g. killed for running out of memory: its boards are lost,
+# so the search can never finish (workers only exit cleanly, with code 0, once they are told to stop)
+def _check_workers(processes):
+    for process in processes:
+        if process.exitcode not in (None, 0):
+            raise RuntimeError(f"HDA* worker {process.name} exited with code {process.exitcode}")
+
+# next item on the results queue, checking between waits that every worker is still there to send it
+def _result(results, processes):
+    while True:
+        try:
+            return results.get(timeout=0.1)
+        except queue.Empty:
+            _check_workers(processes)
+
+# same arguments and result as a_star_search, solved by workers processes (one per CPU by default)
+# batch_size is how many boards are sent to another worker at once; stats, if given, gets the expanded count
+def hda_star_search(start_board, grid_size, goal_positions, goal_board, workers=None, batch_size=256, return_moves=False,
+                    stats=None):
+    if is_solvable(start_board) != is_solvable(goal_board):
+        return None
+    workers = workers or os.cpu_count()
+    space = PackedBoards(grid_size, goal_positions)
+    start = space.pack(start_board)
+    goal = space.pack(goal_board)
+
+    context = multiprocessing.get_context()
+    inboxes = [context.Queue() for _ in range(workers)]
+    results = context.Queue()
+    incumbent = context.Value('i', INFINITY)                # length of the best solution so far
+    sent = context.Array('q', workers + 1, lock=False)      # batches sent by each worker, the last slot is this process
+    received = context.Array('q', workers, lock=False)
+    idle = context.Array('b', workers, lock=False)
+    processes = [context.Process(target=_worker, daemon=True,
+                                 args=(i, workers, grid_size, goal_positions, goal, inboxes, results, incumbent,
+                                       sent, received, idle, batch_size))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+    try:
+        sent[workers] = 1
+        inboxes[owner(start, workers)].put(('nodes', [(start, 0, None)]))
+        while True:
+            time.sleep(0.002)
+            _check_workers(processes)
+            before = (sum(sent), sum(received))
+            all_idle = all(idle)
+            after = (sum(sent), sum(received))
+            if all_idle and before == after and after[0] == after[1]:
+                break
+        if incumbent.value == INFINITY:
+            path = None
+        else:
+            # walk the parents back from the goal, asking each board's owner
+            path = [goal]
+            while path[-1] != start:
+                inboxes[owner(path[-1], workers)].put(('parent', path[-1]))
+                path.append(_result(results, processes))
+            path.reverse()
+        for inbox in inboxes:
+            inbox.put(('stop', None))
+        expanded = sum(_result(results, processes) for _ in range(workers))
+    except BaseException:
+        for process in processes:                   # they were never told to stop, don't wait for them
+            if process.is_alive():
+                process.terminate()
+        raise
+    finally:
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+    if stats is not None:
+        stats.searches += 1
+        stats.expanded += expanded
+    if path is None:
+        return None
+    if return_moves:
+        return blank_path_to_string([state >> space.blank_shift for state in path], grid_size)
+    return [space.unpack(state) for state in path]
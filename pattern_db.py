@@ -0,0 +1,192 @@
+# pattern databases
+# additive pattern database heuristic: the tiles are split into disjoint groups, and for every placement of a
+# group's tiles a table stores how many moves of those tiles it takes to reach their goal cells. Only moves of
+# the group's own tiles are counted, so the values of the groups can be added and the sum is still admissible.
+# The value is stored per placement and blank cell: one move changes one group's value by at most one and leaves
+# the others alone, so the heuristic is consistent and A*, which never reopens an expanded board, stays optimal.
+# (The smallest value over all blank cells would take less space, but can drop by more than one in a single move.)
+# Tables are built once by a breadth first search backwards from the goal, saved as one byte per placement and
+# blank cell, and memory mapped when solving.
+import os
+import sys
+import mmap
+import struct
+from functions import make_goal_board, make_goal_positions, move_table
+from symmetry import mirror_tiles, transpose_cell
+
+# tile groups, by grid size and name
+PARTITIONS = {
+    3: {
+        '4-4': [[1, 2, 3, 4], [5, 6, 7, 8]],
+        '3-3-2 mirrored': [[2, 3, 6], [4, 7, 8], [1, 5]],
+    },
+    4: {
+        '6-6-3': [[1, 5, 6, 9, 10, 13], [7, 8, 11, 12, 14, 15], [2, 3, 4]],
+        # above the diagonal, below it, and on it: the second group is the mirror image of the first and uses its table
+        '6-6-3 mirrored': [[2, 3, 4, 7, 8, 12], [5, 9, 13, 10, 14, 15], [1, 6, 11]],
+    },
+}
+
+MAGIC = b'STPB'                                 # file signature, tables keyed by placement and blank cell
+HEADER = struct.Struct('<4sBB')                 # magic, grid size, number of tiles (the tiles follow, one byte each)
+UNSEEN = 0xFF
+WAITING = 0xFE                                  # reached by a group move, its distance is set with the next layer
+
+# number of placements of k tiles on a board with the given number of cells
+def table_size(cells, k):
+    size = 1
+    for i in range(k):
+        size *= cells - i
+    return size
+
+# rank the cells of a group's tiles (a partial permutation) into 0..table_size - 1
+def rank_positions(positions, cells):
+    index = 0
+    for i, pos in enumerate(positions):
+        digit = pos
+        for earlier in positions[:i]:                   # cells already taken by earlier tiles are skipped
+            if earlier < pos:
+                digit -= 1
+        index = index * (cells - i) + digit
+    return index
+
+# inverse of rank_positions
+def unrank_positions(index, cells, k):
+    digits = []
+    for i in range(k - 1, -1, -1):
+        index, digit = divmod(index, cells - i)
+        digits.append(digit)
+    free = list(range(cells))
+    return [free.pop(digit) for digit in reversed(digits)]
+
+# build the table for one tile group by 0-1 breadth first search from the goal
+# a search state is (placement of the group's tiles, blank cell), stored at rank * cells + blank cell;
+# moving a group tile costs 1, moving any other tile costs 0
+def build_table(grid_size, tiles, goal_positions):
+    cells = grid_size * grid_size
+    k = len(tiles)
+    moves = move_table(grid_size)
+    table = bytearray(b'\xff') * (table_size(cells, k) * cells)     # fewest group moves for each state
+
+    gi, gj = goal_positions[None]
+    goal = [goal_positions[t][0] * grid_size + goal_positions[t][1] for t in tiles]
+    start = rank_positions(goal, cells) * cells + gi * grid_size + gj
+    table[start] = 0
+    layer = [start]
+    distance = 0
+    while layer:
+        next_layer = []
+        i = 0
+        while i < len(layer):                           # the layer grows while it is walked, with zero cost moves
+            current = layer[i]
+            i += 1
+            index, blank = divmod(current, cells)
+            positions = unrank_positions(index, cells, k)
+            for pos in moves[blank]:
+                if pos in positions:                    # a group tile slides into the blank, costs one move
+                    moved = positions[:]
+                    moved[moved.index(pos)] = blank
+                    neighbor = rank_positions(moved, cells) * cells + pos
+                    if table[neighbor] == UNSEEN:
+                        table[neighbor] = WAITING
+                        next_layer.append(neighbor)
+                else:                                   # some other tile slides, the placement doesn't change
+                    neighbor = index * cells + pos
+                    if table[neighbor] >= WAITING:
+                        table[neighbor] = distance
+                        layer.append(neighbor)
+        # states that were also reached for free in this layer are already done
+        distance += 1
+        layer = []
+        for neighbor in next_layer:
+            if table[neighbor] == WAITING:
+                table[neighbor] = distance
+                layer.append(neighbor)
+    return table
+
+# file name of a group's table
+def table_path(directory, grid_size, tiles):
+    return os.path.join(directory, f"{grid_size}x{grid_size}_{'-'.join(map(str, tiles))}.pdb")
+
+# write a table to disk
+def save_table(path, grid_size, tiles, table):
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, grid_size, len(tiles)))
+        f.write(bytes(tiles))
+        f.write(table)
+
+# one tile group's table, memory mapped read-only
+class PatternTable:
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            magic, self.grid_size, k = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a pattern database file")
+            self.tiles = list(f.read(k))
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offset = HEADER.size + k
+        self.cells = self.grid_size * self.grid_size
+
+    # moves of this group's tiles needed, given the cell of every tile and of the blank (None)
+    def lookup(self, cell_of):
+        return self.map[self.offset + rank_positions([cell_of[t] for t in self.tiles], self.cells) * self.cells + cell_of[None]]
+
+    def close(self):
+        self.map.close()
+
+# additive heuristic over all groups of a partition, building and caching any table that is missing
+# the goal is the usual one (tiles in order, blank in the bottom right corner)
+# a group that is the mirror image of an earlier group across the diagonal (see symmetry.py) has no table of its own:
+# its value is the earlier group's value on the transposed board, so only half of a mirrored partition is stored
+class PatternDatabase:
+    def __init__(self, grid_size, partition=None, directory='pdb'):
+        if partition is None:
+            partition = next(iter(PARTITIONS[grid_size].values()))
+        elif isinstance(partition, str):
+            partition = PARTITIONS[grid_size][partition]
+        self.grid_size = grid_size
+        self.tables = []                                # (table, mirrored)
+        self.mirror = mirror_tiles(grid_size)
+        goal_positions = make_goal_positions(make_goal_board(grid_size))
+        os.makedirs(directory, exist_ok=True)
+        for tiles in partition:
+            mirrored = sorted(self.mirror[t] for t in tiles)
+            table = next((table for table, _ in self.tables if sorted(table.tiles) == mirrored), None)
+            if table is not None:
+                self.tables.append((table, True))
+                continue
+            path = table_path(directory, grid_size, tiles)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    if f.read(len(MAGIC)) != MAGIC:         # left over from an older layout, built again
+                        os.remove(path)
+            if not os.path.exists(path):
+                save_table(path, grid_size, tiles, build_table(grid_size, tiles, goal_positions))
+            self.tables.append((PatternTable(path), False))
+        self.has_mirrors = any(mirrored for _, mirrored in self.tables)
+
+    # same call as functions.heuristic, so it can be passed as heuristic_fn to the searches
+    def __call__(self, board, grid_size, goal_positions):
+        cell_of = {}
+        pos = 0
+        for row in board:
+            for tile in row:
+                cell_of[tile] = pos
+                pos += 1
+        mirrored_cell_of = None                         # cell of every tile on the transposed board
+        if self.has_mirrors:
+            mirrored_cell_of = {self.mirror[tile]: transpose_cell(pos, self.grid_size) for tile, pos in cell_of.items()}
+        return sum(table.lookup(mirrored_cell_of if mirrored else cell_of) for table, mirrored in self.tables)
+
+    def close(self):
+        for table, mirrored in self.tables:
+            if not mirrored:
+                table.close()
+
+# python pattern_db.py [grid size] [partition name] [directory]
+if __name__ == '__main__':
+    grid_size = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    name = sys.argv[2] if len(sys.argv) > 2 else next(iter(PARTITIONS[grid_size]))
+    directory = sys.argv[3] if len(sys.argv) > 3 else 'pdb'
+    PatternDatabase(grid_size, name, directory).close()
+    print(f"pattern database {grid_size}x{grid_size} {name} ready in {directory}")
@@ -0,0 +1,74 @@
+# rank indexed A* for 3x3
+# the 3x3 puzzle has only 9! boards, so instead of dicts and sets keyed by board tuples every node is its
+# permutation rank, and its g-score, closed flag and parent move live in two preallocated bytearrays indexed by it:
+# about 725 KB for a whole search, however many nodes it touches, and no hashing
+from math import factorial
+from heap import BucketQueue
+from functions import *
+
+UNSEEN = 0x7F            # g-score of a board not reached yet
+CLOSED = 0x80            # flag bit on the g-score of an expanded board
+MAX_TABLE = factorial(9) # bigger boards need tables that don't fit in memory
+
+# same arguments and result as a_star_search, for boards of 9 cells or fewer
+def a_star_search_ranked(start_board, grid_size, goal_positions, goal_board, heuristic_fn=None, open_list=BucketQueue, return_moves=False):
+    cells = grid_size * grid_size
+    size = factorial(cells)
+    if size > MAX_TABLE:
+        raise ValueError(f"rank tables only fit boards up to 3x3, not {grid_size}x{grid_size}")
+    if is_solvable(start_board) != is_solvable(goal_board):
+        return None
+    moves = move_table(grid_size)
+    start = [tile or 0 for row in start_board for tile in row]   # blank as 0 so boards rank as permutations of 0..8
+    start_rank = rank_permutation(start)
+    goal_rank = rank_permutation([tile or 0 for row in goal_board for tile in row])
+
+    g_score = bytearray([UNSEEN]) * size     # g-score by rank, CLOSED bit set once expanded
+    parent = bytearray(size)                 # cell the blank was in before the move that reached the rank
+
+    g_score[start_rank] = 0
+    open_heap = open_list()
+    h = heuristic if heuristic_fn is None else heuristic_fn
+    open_heap.push(h(start_board, grid_size, goal_positions), start_rank, 0)
+    while len(open_heap) > 0:
+        current_f, current = open_heap.pop()
+        current_g = g_score[current]
+        if current_g & CLOSED:               # stale entry
+            continue
+        if current == goal_rank:
+            return _rebuild_path(current, start_rank, parent, cells, grid_size, return_moves)
+        g_score[current] = current_g | CLOSED
+        current_h = current_f - current_g
+        tentative_g = current_g + 1
+        perm = unrank_permutation(current, cells)
+        blank = perm.index(0)
+        for pos in moves[blank]:
+            if heuristic_fn is None:
+                child_h = flat_heuristic_delta(perm, blank, pos, current_h, grid_size, goal_positions)
+            perm[blank], perm[pos] = perm[pos], 0
+            neighbor = rank_permutation(perm)
+            if heuristic_fn is not None:
+                child_h = heuristic_fn([[t or None for t in perm[i:i + grid_size]] for i in range(0, cells, grid_size)],
+                                       grid_size, goal_positions)
+            perm[pos], perm[blank] = perm[blank], 0
+            neighbor_g = g_score[neighbor]
+            if not neighbor_g & CLOSED and tentative_g < neighbor_g:   # unseen boards have g UNSEEN
+                g_score[neighbor] = tentative_g
+                parent[neighbor] = blank
+                open_heap.push(tentative_g + child_h, neighbor, tentative_g)
+    return None
+
+# walk the parent moves back from the goal to the start, returning the boards (or the move string) from start to goal
+def _rebuild_path(rank, start_rank, parent, cells, grid_size, return_moves):
+    perm = unrank_permutation(rank, cells)
+    path = [perm[:]]
+    while rank != start_rank:
+        blank = perm.index(0)
+        previous = parent[rank]
+        perm[blank], perm[previous] = perm[previous], 0       # slide the tile back
+        rank = rank_permutation(perm)
+        path.append(perm[:])
+    path.reverse()
+    if return_moves:
+        return blank_path_to_string([flat.index(0) for flat in path], grid_size)
+    return [[[t or None for t in flat[i:i + grid_size]] for i in range(0, cells, grid_size)] for flat in path]
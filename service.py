@@ -0,0 +1,164 @@
+# solver service
+# a long running asyncio server that answers boards sent one per line in the encode_board format (123456780)
+# with one JSON line each, in the same format as solve_cli.py:
+#   python service.py --port 8765                     localhost TCP
+#   python service.py --unix /tmp/puzzle.sock         Unix socket
+# Boards the knowledge base covers, cached boards and boards with no solution are answered right away in the event loop.
+# Everything else goes to a pool of worker processes. Requests for a board that is already being solved wait on
+# that computation instead of starting another. At most --max-inflight searches run or wait at once, more are
+# turned away as "overloaded", and a request that takes longer than --timeout gets a "timeout" answer
+# (its search keeps running and its answer is cached for the next request). A search that fails gets an "error" answer,
+# and if a worker process died (e.g. killed for running out of memory) the pool is replaced for the requests after it.
+# The line STATS answers with the service's counters.
+import os
+import json
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functions import is_solvable, decode_board
+from batch import SOLVERS, solve_one
+from cache import SolutionCache
+from solve_cli import key_error, format_result
+
+class SolverService:
+    def __init__(self, method='a_star', workers=None, knowledge_path='knowledge.bin', max_inflight=64, timeout=10.0,
+                 cache_size=100000):
+        self.method = method
+        self.workers = workers or os.cpu_count()
+        self.knowledge_path = knowledge_path
+        self.timeout = timeout
+        self.max_inflight = max_inflight
+        self.knowledge = None
+        if knowledge_path is not None and os.path.exists(knowledge_path):
+            from knowledge import open_knowledge
+            self.knowledge = open_knowledge(knowledge_path)
+        self.cache = SolutionCache(capacity=cache_size)
+        self.pool = ProcessPoolExecutor(self.workers)
+        self.inflight = {}                      # key -> future of the search solving it
+        self.counters = {"requests": 0, "inline": 0, "coalesced": 0, "searched": 0, "timeouts": 0, "overloaded": 0,
+                         "errors": 0, "pool_restarts": 0}
+
+    # a pool with a dead worker refuses all work, so a broken pool is swapped for a new one
+    # (only once: pool is the one that failed, and it may already have been replaced)
+    def replace_pool(self, pool):
+        if self.pool is pool:
+            self.counters["pool_restarts"] += 1
+            self.pool = ProcessPoolExecutor(self.workers)
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # (moves, error) for a board answered without a search, (None, None) if it needs one
+    def answer_inline(self, board):
+        if not is_solvable(board):
+            return None, "unsolvable"
+        if self.knowledge is not None and len(board) == self.knowledge.rows == self.knowledge.cols:
+            moves = self.knowledge.lookup_string(board)
+            if moves is not None:
+                return moves, None
+        return self.cache.get(board), None
+
+    # search for a key in the pool, shared by every request for it until it finishes
+    def search(self, key):
+        future = self.inflight.get(key)
+        if future is not None:
+            self.counters["coalesced"] += 1
+            return future
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        future = loop.run_in_executor(pool, solve_one, key, self.method, self.knowledge_path)
+        self.inflight[key] = future
+        self.counters["searched"] += 1
+
+        def finished(done):
+            del self.inflight[key]
+            if done.cancelled():
+                return
+            if isinstance(done.exception(), BrokenProcessPool):
+                self.replace_pool(pool)
+            elif done.exception() is None and done.result()[0] is not None:
+                self.cache.put(key, done.result()[0])
+        future.add_done_callback(finished)
+        return future
+
+    # one response line for one request line
+    async def respond(self, key):
+        if key == 'STATS':
+            return json.dumps(dict(self.counters, inflight=len(self.inflight), cache=self.cache.stats()))
+        self.counters["requests"] += 1
+        error = key_error(key)
+        if error is not None:
+            return format_result(key, None, error, 'jsonl')
+        board = decode_board(key, int(round(len(key) ** 0.5)))
+        moves, error = self.answer_inline(board)
+        if moves is not None or error is not None:
+            self.counters["inline"] += 1
+            return format_result(key, moves, error, 'jsonl')
+        if key not in self.inflight and len(self.inflight) >= self.max_inflight:
+            self.counters["overloaded"] += 1
+            return format_result(key, None, "overloaded", 'jsonl')
+        pool = self.pool
+        try:
+            # shield: a request that gives up must not cancel the search other requests are waiting on
+            moves, error = await asyncio.wait_for(asyncio.shield(self.search(key)), self.timeout)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            return format_result(key, None, "timeout", 'jsonl')
+        except Exception as exc:
+            if isinstance(exc, BrokenProcessPool):      # the pool may have broken before the search was handed to it
+                self.replace_pool(pool)
+            self.counters["errors"] += 1
+            return format_result(key, None, f"search failed: {type(exc).__name__}", 'jsonl')
+        return format_result(key, moves, error, 'jsonl')
+
+    # requests on one connection are answered in order; a client that wants more at once opens more connections
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                key = line.decode().strip()
+                if key:
+                    writer.write((await self.respond(key) + "\n").encode())
+                    await writer.drain()        # stop reading while the client isn't reading its answers
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+        if self.knowledge is not None:
+            self.knowledge.close()
+
+async def serve(service, host='127.0.0.1', port=8765, unix=None):
+    if unix is not None:
+        server = await asyncio.start_unix_server(service.handle, unix)
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve sliding tile puzzle solutions over TCP or a Unix socket.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', metavar='PATH', help="listen on a Unix socket instead of TCP")
+    parser.add_argument('--method', choices=list(SOLVERS), default='a_star', help="search used for boards not looked up")
+    parser.add_argument('--workers', type=int, default=None, help="search processes, one per CPU by default")
+    parser.add_argument('--knowledge', default='knowledge.bin', help="knowledge base to answer from, skipped if missing")
+    parser.add_argument('--max-inflight', type=int, default=64, help="searches running or queued before new ones are refused")
+    parser.add_argument('--timeout', type=float, default=10.0, help="seconds a request waits for its search")
+    parser.add_argument('--cache-size', type=int, default=100000, help="solutions kept in memory")
+    args = parser.parse_args(argv)
+
+    service = SolverService(args.method, args.workers, args.knowledge, args.max_inflight, args.timeout, args.cache_size)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# headless solver
+# reads boards one per line in the encode_board format (123456780) from files or stdin and writes one solution per line,
+# without pygame. Every stage is a generator, so memory stays the same however many lines come in.
+#   python solve_cli.py boards.txt > solutions.jsonl
+#   cat boards.txt | python solve_cli.py --format moves --method knowledge --workers 4
+import sys
+import json
+import argparse
+import fileinput
+from functions import TILE_CHARS
+from batch import METHODS, solve_many, solve_serial
+from cache import SolutionCache
+
+# non-empty lines of the inputs, without whitespace
+def read_keys(files):
+    with fileinput.input(files) as lines:
+        for line in lines:
+            key = line.strip()
+            if key:
+                yield key
+
+# why a key is not a board, or None if it is fine
+def key_error(key):
+    grid_size = int(round(len(key) ** 0.5))
+    if grid_size < 2 or grid_size * grid_size != len(key):
+        return "board length is not a square"
+    if sorted(key) != sorted(TILE_CHARS[:len(key)]):
+        return f"board is not a permutation of {TILE_CHARS[:len(key)]}"
+    return None
+
+# one output line per result
+def format_result(key, moves, error, output_format):
+    if output_format == 'moves':
+        return f"{key} {'-' if moves is None else moves}"
+    if error is None and moves is None:
+        error = "unsolvable"
+    if error is not None:
+        return json.dumps({"board": key, "error": error})
+    return json.dumps({"board": key, "length": len(moves), "moves": moves})
+
+# (key, moves, error) for every key that had to be solved, bad keys and cached boards go to report(key, moves, error)
+# as they are read instead of to the solver
+def solve_keys(keys, args, report, cache=None):
+    def valid_keys():
+        for key in keys:
+            error = key_error(key)
+            if error is not None:
+                report(key, None, error)
+                continue
+            moves = None if cache is None else cache.get(key)
+            if moves is not None:
+                report(key, moves, None)
+            else:
+                yield key
+    if args.workers > 1:
+        results = solve_many(valid_keys(), workers=args.workers, method=args.method,
+                             chunksize=args.chunksize, knowledge_path=args.knowledge)
+    else:
+        results = solve_serial(valid_keys(), method=args.method, knowledge_path=args.knowledge)
+    for _, key, moves, error in results:
+        if cache is not None and moves is not None:
+            cache.put(key, moves)
+        yield key, moves, error
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve sliding tile puzzles read one per line (e.g. 123456780).")
+    parser.add_argument('files', nargs='*', default=['-'], help="files to read boards from, stdin if none")
+    parser.add_argument('--method', choices=METHODS, default='a_star', help="how to solve each board")
+    parser.add_argument('--format', choices=['jsonl', 'moves'], default='jsonl', dest='output_format',
+                        help="jsonl objects, or '<board> <moves>' with one letter per move (- if unsolvable)")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes, 1 solves in this process")
+    parser.add_argument('--chunksize', type=int, default=1, help="boards sent to a worker at once")
+    parser.add_argument('--knowledge', default='knowledge.bin', help="knowledge base used by --method knowledge")
+    parser.add_argument('--cache', metavar='FILE', help="SQLite file of solutions to reuse and add to")
+    parser.add_argument('--cache-size', type=int, default=100000, help="solutions kept in memory by --cache")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout
+    report = lambda key, moves, error: out.write(format_result(key, moves, error, args.output_format) + "\n")
+    cache = None if args.cache is None else SolutionCache(capacity=args.cache_size, path=args.cache)
+    try:
+        for key, moves, error in solve_keys(read_keys(args.files), args, report, cache):
+            out.write(format_result(key, moves, error, args.output_format) + "\n")
+    finally:
+        if cache is not None:
+            cache.close()
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,9 @@
 # play from file
-# solve a random solvable 3x3 sliding tile puzzle by getting the list of moves needed to solve it from the "knowledge.txt" file
+# solve a random solvable 3x3 sliding tile puzzle by getting the list of moves needed to solve it from the knowledge base (knowledge.bin)
 import pygame
 import sys
-import ast
 from functions import *
+from knowledge import open_knowledge
 
 # constants used mostly for pygame
 TILE_SIZE = 100                   # size of each tile
@@ -24,28 +24,10 @@ DIRECTION = {
 }
 
 # Define goal state
-GOAL_BOARD = [
-    [1, 2, 3],
-    [4, 5, 6],
-    [7, 8, None]
-]
+GOAL_BOARD = make_goal_board(GRID_SIZE)
 
 # Precompute goal positions for heuristic calculations
-GOAL_POSITIONS = {1: (0, 0), 2: (0, 1), 3: (0, 2),
-                  4: (1, 0), 5: (1, 1), 6: (1, 2),
-                  7: (2, 0), 8: (2, 1), None: (2, 2)}
-
-# encode board into a string for finding the solution in the file
-# i.e. [[1, 2, 3], [4, 5, 6], [7, 8, None]] -> 123456780
-def encode_board(board):
-    string = ""
-    for i in range(3):
-        for j in range(3):
-            if board[i][j] == None:
-                string += '0'
-            else:
-                string += str(board[i][j])
-    return string
+GOAL_POSITIONS = make_goal_positions(GOAL_BOARD)
 
 # find the blank tile
 def find_blank(board):
@@ -117,15 +99,10 @@ tile_set = random_solvable_board(GRID_SIZE)
 clock = pygame.time.Clock()
 step_index = 0
 solved = False
-encoded_board = encode_board(tile_set)
-moves = []
 
 # get the list of moves needed to solve the board state
-with open('knowledge.txt', 'r') as f:                       # open the knowledge.txt file (see train.py for more info)
-    for line in f:                                          # for each line in the file
-        key, moves_str = line.strip().split(':', 1)         # unpack the state key and the moves list, we already know each entry is solvable
-        if key == encoded_board:                            # if the key is found
-            moves = ast.literal_eval(moves_str)             # add the needed moves to the moves array
+with open_knowledge('knowledge.bin') as kb:                 # map the binary knowledge base read-only, full or symmetry reduced (see knowledge.py)
+    moves = kb.lookup(tile_set) or []                       # one seek for the board's record, we already know it is solvable
 
 # moves is a list of (tile, direction) tuples
 directions = moves
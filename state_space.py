@@ -0,0 +1,118 @@
+# state space generator
+# rebuilds the knowledge base from scratch with one breadth first search backwards from the goal.
+# Boards are handled by their permutation rank, and the search keeps two flat byte arrays indexed by rank:
+# the distance to the goal and the direction of the first move towards it. No dicts of tuples.
+#   python state_space.py                  3x3 -> knowledge.bin
+#   python state_space.py 2 4 k24.bin -j 4 2x4, each BFS layer split over 4 processes
+import argparse
+from math import factorial
+from concurrent.futures import ProcessPoolExecutor
+from functions import rank_permutation, unrank_permutation
+from knowledge import HEADER, MAGIC, VERSION, DIRECTION_CODES, pack_record
+
+UNSEEN = 0xFF
+
+# for each blank cell of a rows x cols board, (cell of a tile next to it, code of the move that slides it back)
+# after the tile slides into the blank, sliding it back (from the old blank cell towards its old cell) undoes the move,
+# and that is the move the backwards search records for the new board
+def reverse_moves(rows, cols):
+    table = []
+    for blank in range(rows * cols):
+        i, j = divmod(blank, cols)
+        entry = []
+        for direction, (di, dj) in [('up', (-1, 0)), ('down', (1, 0)), ('left', (0, -1)), ('right', (0, 1))]:
+            x, y = i + di, j + dj
+            if 0 <= x < rows and 0 <= y < cols:
+                # the tile goes from (x, y) to the blank, so sliding it back travels by (di, dj)
+                entry.append((x * cols + y, DIRECTION_CODES[direction]))
+        table.append(entry)
+    return table
+
+# rank of the goal board: tiles in order, blank last
+def goal_rank(rows, cols):
+    return rank_permutation(list(range(1, rows * cols)) + [0])
+
+# every (neighbor rank, move code back) of a list of ranks, can run in a worker process
+def expand(ranks, rows, cols):
+    cells = rows * cols
+    moves = reverse_moves(rows, cols)
+    found = []
+    for rank in ranks:
+        perm = unrank_permutation(rank, cells)
+        blank = perm.index(0)
+        for pos, code in moves[blank]:
+            perm[blank], perm[pos] = perm[pos], 0       # slide the tile into the blank
+            found.append((rank_permutation(perm), code))
+            perm[pos], perm[blank] = perm[blank], 0     # and back
+    return found
+
+# breadth first search from the goal over every reachable board
+# returns (distance, moves, layers): distance[rank] and moves[rank] are bytearrays (UNSEEN for boards that can't be reached)
+# and layers[d] holds the ranks d moves from the goal
+def generate(rows, cols, workers=1, chunk=20000):
+    count = factorial(rows * cols)
+    distance = bytearray(b'\xff') * count
+    moves = bytearray(b'\xff') * count
+    start = goal_rank(rows, cols)
+    distance[start] = 0
+    layers = [[start]]
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        while layers[-1]:
+            frontier = layers[-1]
+            depth = len(layers)
+            if pool is None:
+                found = [expand(frontier, rows, cols)]
+            else:
+                chunks = [frontier[i:i + chunk] for i in range(0, len(frontier), chunk)]
+                found = pool.map(expand, chunks, [rows] * len(chunks), [cols] * len(chunks))
+            layer = []
+            for part in found:
+                for rank, code in part:
+                    if distance[rank] == UNSEEN:
+                        distance[rank] = depth
+                        moves[rank] = code
+                        layer.append(rank)
+            layers.append(layer)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    layers.pop()
+    return distance, moves, layers
+
+# write the search result in the knowledge.bin format, one record per rank
+# each board's moves are its own first move followed by the moves of the board that move leads to
+def write_knowledge(path, rows, cols, distance, moves, layers):
+    cells = rows * cols
+    record_size = 1 + (2 * (len(layers) - 1) + 7) // 8
+    records = bytearray(b'\xff' * record_size) * factorial(cells)
+    step = {code: (pos - blank) for blank, entry in enumerate(reverse_moves(rows, cols))
+            for pos, code in entry}                         # code -> change of the blank cell, the same from any cell
+    records[layers[0][0] * record_size:(layers[0][0] + 1) * record_size] = pack_record([], record_size)
+    for layer in layers[1:]:
+        for rank in layer:
+            perm = unrank_permutation(rank, cells)
+            blank = perm.index(0)
+            code = moves[rank]
+            pos = blank - step[code]                        # the tile that moves is on the side opposite its direction
+            perm[blank], perm[pos] = perm[pos], 0
+            parent = rank_permutation(perm) * record_size
+            packed = int.from_bytes(records[parent + 1:parent + record_size], 'little')
+            record = bytes([records[parent] + 1]) + (code | packed << 2).to_bytes(record_size - 1, 'little')
+            records[rank * record_size:(rank + 1) * record_size] = record
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, rows, cols, record_size))
+        f.write(records)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build a knowledge base by breadth first search from the goal.")
+    parser.add_argument('rows', type=int, nargs='?', default=3)
+    parser.add_argument('cols', type=int, nargs='?', default=None)
+    parser.add_argument('output', nargs='?', default='knowledge.bin')
+    parser.add_argument('-j', '--workers', type=int, default=1, help="processes to split each layer over")
+    args = parser.parse_args()
+    cols = args.rows if args.cols is None else args.cols
+
+    distance, moves, layers = generate(args.rows, cols, args.workers)
+    write_knowledge(args.output, args.rows, cols, distance, moves, layers)
+    print(f"{sum(len(layer) for layer in layers)} boards, deepest {len(layers) - 1} moves, written to {args.output}")
@@ -0,0 +1,21 @@
+# search statistics
+# counters filled in by a_star_search when it is given a stats object. One object can be passed to many searches
+# and keeps adding up, so it works both for one slow solve and for a whole run
+class SearchStats:
+    def __init__(self):
+        self.searches = 0
+        self.expanded = 0           # boards taken off the open list and expanded
+        self.generated = 0          # neighbor boards made
+        self.stale = 0              # open list entries skipped because the board was already expanded
+        self.improved = 0           # boards already on the open list that were reached by a shorter path
+        self.reopened = 0           # expanded boards reached again by a shorter path (only with an inconsistent heuristic)
+        self.peak_open = 0          # largest open list size
+        self.heuristic_calls = 0
+        self.heuristic_time = 0.0   # seconds spent in the heuristic
+        self.search_time = 0.0      # seconds spent in the searches
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    def __repr__(self):
+        return "SearchStats(" + ", ".join(f"{name}={value}" for name, value in vars(self).items()) + ")"
@@ -0,0 +1,41 @@
+# board symmetry
+# the goal (tiles in order, blank in the bottom right corner) is its own mirror image across the main diagonal:
+# transpose the goal and relabel every tile as the tile whose goal cell mirrors its own, and the goal comes back.
+# So a board and its transposed, relabeled board need the same number of moves, and the moves of one are the
+# moves of the other with up <-> left and down <-> right. Tables only have to store one board of each pair.
+from functions import make_goal_board
+
+TRANSPOSED_LETTERS = str.maketrans('UDLR', 'LRUD')  # move string of a board -> move string of its transposed board
+TRANSPOSED_CODES = [2, 3, 0, 1]                     # same for the knowledge base's 2 bit direction codes
+
+_mirrors = {}                                       # grid size -> mirror_tiles table
+
+# tile -> the tile whose goal cell is its own goal cell mirrored across the main diagonal (the blank stays the blank)
+def mirror_tiles(grid_size):
+    if grid_size not in _mirrors:
+        goal = make_goal_board(grid_size)
+        _mirrors[grid_size] = {goal[i][j]: goal[j][i] for i in range(grid_size) for j in range(grid_size)}
+    return _mirrors[grid_size]
+
+# the board mirrored across the main diagonal, with every tile relabeled
+def transpose_board(board):
+    n = len(board)
+    mirror = mirror_tiles(n)
+    return [[mirror[board[j][i]] for j in range(n)] for i in range(n)]
+
+# moves of a board -> moves of its transposed board (and back, the mapping is its own inverse)
+def transpose_moves(moves):
+    return moves.translate(TRANSPOSED_LETTERS)
+
+# cell index -> the index of the mirrored cell
+def transpose_cell(pos, grid_size):
+    i, j = divmod(pos, grid_size)
+    return j * grid_size + i
+
+# (canonical board, transposed): whichever of the board and its transposed board comes first in reading order,
+# with the blank as 0. That is also the one with the smaller rank and the smaller encode_board key
+def canonical_board(board):
+    transposed = transpose_board(board)
+    if [t or 0 for row in transposed for t in row] < [t or 0 for row in board for t in row]:
+        return transposed, True
+    return board, False
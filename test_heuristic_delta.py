@@ -0,0 +1,30 @@
+# the incremental heuristics must give the same value as heuristic() worked out in full, for every move
+import random
+import pytest
+from functions import *
+
+@pytest.mark.parametrize('grid_size', [3, 4])
+def test_heuristic_delta_matches_heuristic(grid_size):
+    rng = random.Random(grid_size)
+    goal_positions = make_goal_positions(make_goal_board(grid_size))
+    for _ in range(200):
+        board_t = board_to_tuple(random_solvable_board(grid_size, rng))
+        h = heuristic(board_t, grid_size, goal_positions)
+        for neighbor_t, blank_pos, tile_pos in find_all_moves_with_positions(board_t, grid_size):
+            expected = heuristic(neighbor_t, grid_size, goal_positions)
+            assert heuristic_delta(board_t, neighbor_t, h, blank_pos, tile_pos, grid_size, goal_positions) == expected
+
+@pytest.mark.parametrize('grid_size', [3, 4])
+def test_flat_heuristic_delta_matches_heuristic(grid_size):
+    rng = random.Random(grid_size)
+    goal_positions = make_goal_positions(make_goal_board(grid_size))
+    moves = move_table(grid_size)
+    for _ in range(200):
+        flat = [tile for row in random_solvable_board(grid_size, rng) for tile in row]
+        h = heuristic([flat[i:i + grid_size] for i in range(0, len(flat), grid_size)], grid_size, goal_positions)
+        blank = flat.index(None)
+        for pos in moves[blank]:
+            child = flat[:]
+            child[blank], child[pos] = child[pos], None
+            expected = heuristic([child[i:i + grid_size] for i in range(0, len(child), grid_size)], grid_size, goal_positions)
+            assert flat_heuristic_delta(flat, blank, pos, h, grid_size, goal_positions) == expected
@@ -0,0 +1,43 @@
+# the pattern database must give optimal solutions in the A* engines, which never reopen an expanded board,
+# so it has to be consistent as well as admissible
+import random
+import pytest
+from functions import *
+from packed import a_star_search_packed
+from ranked import a_star_search_ranked
+from pattern_db import PatternDatabase, PARTITIONS
+from state_space import generate
+
+@pytest.fixture(scope='module')
+def distance():
+    return generate(3, 3)[0]
+
+@pytest.fixture(scope='module')
+def directory(tmp_path_factory):
+    return str(tmp_path_factory.mktemp('pdb'))
+
+@pytest.mark.parametrize('partition', list(PARTITIONS[3]))
+def test_solution_lengths_match_knowledge(partition, distance, directory):
+    pdb = PatternDatabase(3, partition, directory)
+    goal_board = make_goal_board(3)
+    goal_positions = make_goal_positions(goal_board)
+    rng = random.Random(7)
+    boards = [[[None, 5, 7], [4, 3, 1], [6, 8, 2]]] + [random_solvable_board(3, rng) for _ in range(20)]
+    for board in boards:
+        optimal = distance[rank_board(board)]
+        for search in (a_star_search, a_star_search_packed, a_star_search_ranked):
+            moves = search(board, 3, goal_positions, goal_board, heuristic_fn=pdb, return_moves=True)
+            assert len(moves) == optimal
+    pdb.close()
+
+@pytest.mark.parametrize('partition', list(PARTITIONS[3]))
+def test_heuristic_is_consistent(partition, directory):
+    pdb = PatternDatabase(3, partition, directory)
+    goal_positions = make_goal_positions(make_goal_board(3))
+    rng = random.Random(3)
+    for _ in range(2000):
+        board_t = board_to_tuple(random_solvable_board(3, rng))
+        h = pdb(board_t, 3, goal_positions)
+        for neighbor_t in find_all_moves(board_t, 3):
+            assert abs(pdb(neighbor_t, 3, goal_positions) - h) <= 1
+    pdb.close()
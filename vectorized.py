@@ -0,0 +1,105 @@
+# vectorized heuristics
+# Manhattan distance and linear conflict for a whole array of boards at once with NumPy.
+# Boards are rows of an (n, grid_size ** 2) uint8 array, tiles in reading order and the blank as 0.
+from math import factorial
+import numpy as np
+from functions import TILE_CHARS
+
+# board list (lists of lists, or encode_board strings) -> (n, grid_size ** 2) uint8 array
+def boards_to_array(boards):
+    rows = []
+    for board in boards:
+        if isinstance(board, str):
+            rows.append([TILE_CHARS.index(c) for c in board])
+        else:
+            rows.append([tile or 0 for row in board for tile in row])
+    return np.array(rows, dtype=np.uint8)
+
+# lookup tables for a goal, indexed by tile (0 is the blank)
+#   distance[tile, cell]  Manhattan distance of the tile from its goal when it sits in the cell
+#   goal_row[tile], goal_col[tile]  the tile's goal cell, -1 for the blank so it never counts in a conflict
+def goal_tables(grid_size, goal_positions):
+    cells = grid_size * grid_size
+    i, j = np.divmod(np.arange(cells), grid_size)
+    distance = np.zeros((cells, cells), dtype=np.int32)
+    goal_row = np.full(cells, -1, dtype=np.int32)
+    goal_col = np.full(cells, -1, dtype=np.int32)
+    for tile, (gi, gj) in goal_positions.items():
+        if tile is None:
+            continue
+        distance[tile] = np.abs(gi - i) + np.abs(gj - j)
+        goal_row[tile] = gi
+        goal_col[tile] = gj
+    return distance, goal_row, goal_col
+
+# same as heuristic_sum for every board
+def batch_manhattan(boards, grid_size, goal_positions):
+    boards = np.asarray(boards)
+    distance, _, _ = goal_tables(grid_size, goal_positions)
+    return distance[boards, np.arange(grid_size * grid_size)].sum(axis=1)
+
+# same as linear_conflict for every board
+def batch_linear_conflict(boards, grid_size, goal_positions):
+    boards = np.asarray(boards)
+    _, goal_row, goal_col = goal_tables(grid_size, goal_positions)
+    rows = goal_row[boards]                                     # goal row of the tile in each cell
+    cols = goal_col[boards]                                     # goal column of the tile in each cell
+    conflicts = np.zeros(len(boards), dtype=np.int32)
+    for line in range(grid_size):
+        row_cells = list(range(line * grid_size, (line + 1) * grid_size))
+        col_cells = list(range(line, grid_size * grid_size, grid_size))
+        # row `line`: tiles whose goal row it is, out of order by goal column
+        # column `line`: tiles whose goal column it is, out of order by goal row
+        for cells, home, order in [(row_cells, rows, cols), (col_cells, cols, rows)]:
+            for a in range(grid_size):
+                for b in range(a + 1, grid_size):
+                    ca, cb = cells[a], cells[b]
+                    conflicts += ((home[:, ca] == line) & (home[:, cb] == line) & (order[:, ca] > order[:, cb]))
+    return conflicts
+
+# same as heuristic for every board: Manhattan distance + 2 * linear conflicts
+def batch_heuristic(boards, grid_size, goal_positions):
+    return (batch_manhattan(boards, grid_size, goal_positions)
+            + 2 * batch_linear_conflict(boards, grid_size, goal_positions))
+
+# same as unrank_solvable for every index, as rows of an (n, grid_size ** 2) uint8 array
+# indexes are int64, which holds every index up to 4x4 (16! / 2 boards)
+def unrank_solvable_array(indexes, grid_size):
+    cells = grid_size * grid_size
+    if cells > 16:
+        raise ValueError("boards larger than 4x4 have more indexes than fit in int64")
+    indexes = np.asarray(indexes, dtype=np.int64)
+    count = len(indexes)
+    rows = np.arange(count)
+    pair, blank = np.divmod(indexes, cells)
+    rank = 2 * pair
+    digits = []                                                 # Lehmer digits, least significant first
+    for base in range(1, cells):
+        rank, digit = np.divmod(rank, base)
+        digits.append(digit)
+    # the digit-th tile still available goes next, found as the first cell where the running count of available tiles passes it
+    available = np.ones((count, cells - 1), dtype=bool)
+    tiles = np.zeros((count, cells), dtype=np.uint8)            # the last column stays 0 for the blank
+    for i, digit in enumerate(reversed(digits)):
+        pick = np.argmax(available.cumsum(axis=1) > digit[:, None], axis=1)
+        available[rows, pick] = False
+        tiles[:, i] = pick + 1
+    if grid_size % 2:
+        parity = np.zeros(count, dtype=np.int64)
+    else:
+        parity = (grid_size - 1 - blank // grid_size) % 2
+    swap = np.sum(digits, axis=0) % 2 != parity
+    tiles[swap, cells - 3], tiles[swap, cells - 2] = tiles[swap, cells - 2], tiles[swap, cells - 3]
+    # move the blank from the end to its cell
+    cell = np.arange(cells)
+    source = cell - (cell > blank[:, None])
+    source[cell == blank[:, None]] = cells - 1
+    return np.take_along_axis(tiles, source, axis=1)
+
+# count uniformly random solvable boards, the same boards for the same seed
+def random_boards(count, grid_size, seed=None):
+    rng = np.random.default_rng(seed)
+    total = factorial(grid_size * grid_size) // 2
+    if total > np.iinfo(np.int64).max:
+        raise ValueError("boards larger than 4x4 have more indexes than fit in int64")
+    return unrank_solvable_array(rng.integers(0, total, size=count, dtype=np.int64), grid_size)
@@ -0,0 +1,118 @@
+# walking distance heuristic
+# Looking only at rows, a board is a small matrix: how many tiles in row r belong in goal row g, plus the blank's row.
+# Every vertical move takes one tile to the blank's row from the row above or below it. The fewest such moves to
+# reach the goal's matrix, found once by breadth first search over all matrices, is a lower bound on the vertical
+# moves a solution needs. The same for columns bounds the horizontal moves, and the two add up to the walking distance.
+# It counts tiles blocking each other between rows, which Manhattan distance can't, and the tables are tiny
+# (24964 matrices for 4x4). The same table serves rows and columns, since the goal is its own mirror image.
+# Every matrix has a compact index, and a move changes the index through a transition table, so the heuristic of
+# a child board is two lookups. a_star_search and ida_star_search use that through initial_state and child_state.
+# Like pattern_db.py, only the usual goal (blank in the bottom right corner) is supported, other goals raise ValueError.
+#   wd = WalkingDistance(4)
+#   path = ida_star_search(board, 4, goal_positions, goal_board, heuristic_fn=wd)
+from array import array
+from functions import *
+
+_tables = {}                                    # grid size -> (index, distance, transitions)
+
+# breadth first search over the row matrices from the goal's
+# index maps (counts, blank row) to a compact index, counts being the matrix in reading order;
+# distance[index] is the fewest vertical moves to the goal, and transitions[(index * 2 + d) * grid_size + g] is
+# the index after the blank moves up (d = 0) or down (d = 1) and a tile that belongs in goal row g takes its place, or -1
+def build_tables(grid_size):
+    n = grid_size
+    counts = [0] * (n * n)
+    for r in range(n):
+        counts[r * n + r] = n
+    counts[-1] = n - 1                                      # the blank's row has one tile less
+    start = (tuple(counts), n - 1)
+    index = {start: 0}
+    states = [start]
+    distance = bytearray([0])
+    transitions = array('i')
+    for current, (counts, blank) in enumerate(states):     # states is in breadth first order and grows while it is walked
+        for row in (blank - 1, blank + 1):
+            for g in range(n):
+                if not 0 <= row < n or counts[row * n + g] == 0:
+                    transitions.append(-1)
+                    continue
+                moved = list(counts)
+                moved[row * n + g] -= 1
+                moved[blank * n + g] += 1
+                state = (tuple(moved), row)
+                if state not in index:
+                    index[state] = len(states)
+                    states.append(state)
+                    distance.append(distance[current] + 1)
+                transitions.append(index[state])
+    return index, distance, transitions
+
+class WalkingDistance:
+    def __init__(self, grid_size):
+        if grid_size not in _tables:
+            _tables[grid_size] = build_tables(grid_size)
+        self.index, self.distance, self.transitions = _tables[grid_size]
+        self.grid_size = grid_size
+        self.goal_positions = make_goal_positions(make_goal_board(grid_size))
+        self.checked = None                                 # last goal_positions found to be the usual goal
+        self.goal_row = [None] + [(tile - 1) // grid_size for tile in range(1, grid_size * grid_size)]
+        self.goal_col = [None] + [(tile - 1) % grid_size for tile in range(1, grid_size * grid_size)]
+
+    # (row index, column index) of a board
+    def indexes(self, board):
+        n = self.grid_size
+        rows = [0] * (n * n)
+        cols = [0] * (n * n)
+        for i, row in enumerate(board):
+            for j, tile in enumerate(row):
+                if tile:
+                    rows[i * n + self.goal_row[tile]] += 1
+                    cols[j * n + self.goal_col[tile]] += 1
+                else:
+                    blank_row, blank_col = i, j
+        return self.index[(tuple(rows), blank_row)], self.index[(tuple(cols), blank_col)]
+
+    # walking distance of a board from its indexes
+    def value(self, row_index, col_index):
+        return self.distance[row_index] + self.distance[col_index]
+
+    # indexes after the tile at flat cell pos slides into the blank at flat cell blank
+    def after_move(self, row_index, col_index, blank, pos, tile):
+        n = self.grid_size
+        if pos == blank - n:                                # tile comes down, the blank goes up a row
+            row_index = self.transitions[row_index * 2 * n + self.goal_row[tile]]
+        elif pos == blank + n:
+            row_index = self.transitions[(row_index * 2 + 1) * n + self.goal_row[tile]]
+        elif pos == blank - 1:                              # tile comes right, the blank goes left a column
+            col_index = self.transitions[col_index * 2 * n + self.goal_col[tile]]
+        else:
+            col_index = self.transitions[(col_index * 2 + 1) * n + self.goal_col[tile]]
+        return row_index, col_index
+
+    # ValueError unless goal_positions is the usual goal, the tables don't fit any other
+    def check_goal(self, goal_positions):
+        if goal_positions is not self.checked:
+            if goal_positions != self.goal_positions:
+                raise ValueError("the walking distance tables only fit the goal with the blank in the bottom right corner")
+            self.checked = goal_positions
+
+    # same call as functions.heuristic, so it can be passed as heuristic_fn to the searches
+    # the larger of the walking distance and Manhattan distance + linear conflicts: both are lower bounds, so the
+    # larger one is too, and it is never weaker than heuristic
+    def __call__(self, board, grid_size, goal_positions):
+        self.check_goal(goal_positions)
+        return max(self.value(*self.indexes(board)), heuristic(board, grid_size, goal_positions))
+
+    # incremental form of __call__ for the searches (see a_star_search): the state is
+    # (Manhattan distance + linear conflicts, row index, column index), updated by flat_heuristic_delta and after_move
+    def initial_state(self, board, grid_size, goal_positions):
+        self.check_goal(goal_positions)
+        h = heuristic(board, grid_size, goal_positions)
+        rows, cols = self.indexes(board)
+        return max(h, self.distance[rows] + self.distance[cols]), (h, rows, cols)
+
+    def child_state(self, state, flat, blank, pos, grid_size, goal_positions):
+        h, rows, cols = state
+        rows, cols = self.after_move(rows, cols, blank, pos, flat[pos])
+        h = flat_heuristic_delta(flat, blank, pos, h, grid_size, goal_positions)
+        return max(h, self.distance[rows] + self.distance[cols]), (h, rows, cols)